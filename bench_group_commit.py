@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Order insert throughput with and without the group-commit writer.
+
+Starts 50 threads that each create orders through
+src.services.write_queue.insert(), once committing on their own session
+("direct") and once through the single writer thread ("group"), against
+a scratch copy of the schema with the tuned SQLite profile. After each run
+it checks that every returned id exists exactly once and that no row is
+missing or duplicated, then races the threads for one appointment slot
+to check that exactly one booking wins. Finally it posts orders through
+/api/orders while the same slot is booked again within one group, so the
+failing bookings force the writer to roll back and replay the orders, and
+checks that every order comes back once with its line items. It exits
+non-zero if a check fails.
+
+    python bench_group_commit.py [--writers 50] [--orders 40] [--window-ms 5]
+
+Sample run (50 writers x 40 orders, single-core container):
+
+    mode        orders/s   commits   errors   check
+    direct          1197      2000        0   ok
+    group           1659        40        0   ok
+    slot race: 1 booked, 49 rejected   ok
+    mixed group: 6 orders with items, 1 booked, 5 rejected   ok
+
+Grouping turns 2000 commits into 40, about 50 orders each. The gain is
+modest here because the tuned profile's WAL commits are cheap and one
+core runs every thread. It grows with the cost of an fsync.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.exc import IntegrityError
+
+def make_app(path, window_ms):
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    from src.main import create_app
+    from src.models import db, User, Doctor, Product
+
+    app = create_app()
+    app.config['WRITE_QUEUE_WINDOW_MS'] = window_ms
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(name='Bench', email='bench@example.com', password_hash='x'))
+        db.session.add(Doctor(name='Dr. Bench', specialty='Dermatology', available_times='["09:00"]'))
+        db.session.add(Product(name='Bench cream', description='', price=25.0, image_url='',
+                               category='skincare'))
+        db.session.commit()
+    return app
+
+def run_orders(app, enabled, writers, orders):
+    from src.models import Order
+    from src.services.write_queue import insert
+
+    app.config['WRITE_QUEUE_ENABLED'] = enabled
+    returned, errors = [], []
+    lock = threading.Lock()
+    start = threading.Barrier(writers)
+
+    def write_loop(worker):
+        ids = []
+        with app.app_context():
+            start.wait()
+            for n in range(orders):
+                def build(db_session, n=n):
+                    order = Order(user_id=1, total_price=worker * 1000 + n,
+                                  payment_method='cash_on_delivery', products_json='[]')
+                    db_session.add(order)
+                    return order
+                try:
+                    ids.append(insert(build, lambda order: (order.id, order.total_price)))
+                except Exception as e:
+                    errors.append(e)
+        with lock:
+            returned.extend(ids)
+
+    began = time.perf_counter()
+    threads = [threading.Thread(target=write_loop, args=(worker,)) for worker in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return returned, errors, time.perf_counter() - began
+
+def check_orders(app, returned, expected):
+    """Every acknowledged order is stored once, with the values it was created with"""
+    from src.models import db, Order
+
+    with app.app_context():
+        rows = dict(db.session.query(Order.id, Order.total_price))
+    returned_ids = [order_id for order_id, _ in returned]
+    return (len(returned) == expected
+            and len(set(returned_ids)) == expected
+            and len(rows) == expected
+            and all(rows.get(order_id) == price for order_id, price in returned))
+
+def slot_race(app, writers):
+    from src.models import Appointment
+    from src.services.write_queue import insert
+
+    app.config['WRITE_QUEUE_ENABLED'] = True
+    slot = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time()) + timedelta(hours=9)
+    outcomes = []
+    start = threading.Barrier(writers)
+
+    def book():
+        with app.app_context():
+            start.wait()
+            def build(db_session):
+                appointment = Appointment(user_id=1, doctor_id=1, appointment_datetime=slot,
+                                          payment_method='cash_on_delivery')
+                db_session.add(appointment)
+                return appointment
+            try:
+                insert(build, lambda appointment: appointment.id)
+                outcomes.append('booked')
+            except IntegrityError:
+                outcomes.append('rejected')
+
+    threads = [threading.Thread(target=book) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes.count('booked'), outcomes.count('rejected')
+
+def mixed_group(app, orders, bookings):
+    """Orders and clashing bookings in one group; the failures force replays"""
+    from src.models import db, Order, OrderItem, Appointment
+    from src.services.write_queue import insert
+
+    app.config.update(WRITE_QUEUE_ENABLED=True, RATE_LIMIT_ENABLED=False, WRITE_QUEUE_WINDOW_MS=200)
+    slot = datetime.combine(datetime.now().date() + timedelta(days=2), datetime.min.time()) + timedelta(hours=9)
+    with app.app_context():
+        Order.query.delete()
+        db.session.commit()
+    statuses, returned, outcomes = [], [], []
+    start = threading.Barrier(orders + bookings)
+
+    def order():
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = 1
+        start.wait()
+        response = client.post('/api/orders', json={'products': [{'id': 1, 'quantity': 2}],
+                                                    'payment_method': 'cash_on_delivery'})
+        statuses.append(response.status_code)
+        if response.status_code == 201:
+            returned.append(response.get_json()['order'])
+
+    def book():
+        with app.app_context():
+            start.wait()
+            def build(db_session):
+                appointment = Appointment(user_id=1, doctor_id=1, appointment_datetime=slot,
+                                          payment_method='cash_on_delivery')
+                db_session.add(appointment)
+                return appointment
+            try:
+                insert(build, lambda appointment: appointment.id)
+                outcomes.append('booked')
+            except IntegrityError:
+                outcomes.append('rejected')
+
+    threads = ([threading.Thread(target=order) for _ in range(orders)]
+               + [threading.Thread(target=book) for _ in range(bookings)])
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        stored = {order_id: total for order_id, total in db.session.query(Order.id, Order.total_price)}
+        items = {}
+        for order_id, quantity in db.session.query(OrderItem.order_id, OrderItem.quantity):
+            items[order_id] = items.get(order_id, 0) + quantity
+    ids = [order['id'] for order in returned]
+    passed = (statuses == [201] * orders
+              and sorted(ids) == sorted(stored) and len(set(ids)) == orders
+              and all(items.get(order['id']) == 2 and order['products'][0]['quantity'] == 2
+                      and stored[order['id']] == order['total_price'] for order in returned)
+              and outcomes.count('booked') == 1 and outcomes.count('rejected') == bookings - 1)
+    return len(returned), outcomes.count('booked'), outcomes.count('rejected'), statuses, passed
+
+def count_commits(app):
+    from sqlalchemy import event
+    from src.models import db
+
+    counter = {'commits': 0}
+    with app.app_context():
+        @event.listens_for(db.engine, 'commit')
+        def _count(conn):
+            counter['commits'] += 1
+    return counter
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=50)
+    parser.add_argument('--orders', type=int, default=40)
+    parser.add_argument('--window-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    from src.models import db, Order
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'bench.db'), args.window_ms)
+        counter = count_commits(app)
+        expected = args.writers * args.orders
+        print(f"{'mode':<10} {'orders/s':>10} {'commits':>9} {'errors':>8}   check")
+        for mode, enabled in (('direct', False), ('group', True)):
+            with app.app_context():
+                Order.query.delete()
+                db.session.commit()
+            counter['commits'] = 0
+            returned, errors, elapsed = run_orders(app, enabled, args.writers, args.orders)
+            passed = not errors and check_orders(app, returned, expected)
+            ok = ok and passed
+            print(f"{mode:<10} {expected / elapsed:>10.0f} {counter['commits']:>9} {len(errors):>8}   "
+                  f"{'ok' if passed else 'FAILED'}")
+            for error in errors[:5]:
+                print(f'  {error!r}')
+
+        booked, rejected = slot_race(app, args.writers)
+        passed = booked == 1 and rejected == args.writers - 1
+        ok = ok and passed
+        print(f"slot race: {booked} booked, {rejected} rejected   {'ok' if passed else 'FAILED'}")
+
+        created, booked, rejected, statuses, passed = mixed_group(app, 6, 6)
+        ok = ok and passed
+        print(f"mixed group: {created} orders with items, {booked} booked, {rejected} rejected   "
+              f"{'ok' if passed else 'FAILED'}")
+        if not passed:
+            print(f'  order statuses: {statuses}')
+        with app.app_context():
+            db.engine.dispose()
+
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Serialization cost of 10k-row listings: ORM objects + to_dict() vs projections.
+
+Builds a scratch database with 10k users and 10k appointments (each with
+its doctor), checks that both paths produce the same JSON, and times
+producing the response body three ways:
+
+    to_dict     ORM objects, to_dict() per row, Flask's default jsonify
+    projection  Projection tuples, FastJSONProvider on the stdlib encoder
+    +orjson     Projection tuples, FastJSONProvider on orjson (if installed)
+
+    python bench_serialize.py [--rows 10000] [--repeat 5]
+
+Sample run (--repeat 10, single-core container, timings are noisy):
+
+    listing       to_dict   projection    +orjson
+    users        189.8 ms     111.4 ms    43.4 ms
+    appointments 380.5 ms     224.3 ms   174.5 ms
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+
+def make_app(path, rows):
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    from src.main import create_app
+    from src.models import db, User, Doctor, Appointment
+
+    app = create_app()
+    now = datetime.utcnow()
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(User), [
+            {'name': f'مستخدم {i}', 'email': f'user{i}@example.com', 'password_hash': 'x', 'created_at': now}
+            for i in range(rows)
+        ])
+        db.session.execute(insert(Doctor), [
+            {'name': f'Dr. {i}', 'specialty': 'Dermatologist', 'available_times': '["09:00", "10:00"]',
+             'created_at': now}
+            for i in range(10)
+        ])
+        db.session.execute(insert(Appointment), [
+            {'user_id': i % rows + 1, 'doctor_id': i % 10 + 1, 'payment_method': 'cash_on_delivery',
+             'appointment_datetime': now + timedelta(hours=i), 'notes': 'ملاحظة', 'status': 'scheduled',
+             'created_at': now}
+            for i in range(rows)
+        ])
+        db.session.commit()
+    return app
+
+def best_of(repeat, fn):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'bench.db'), args.rows)
+
+        from src.models import db, User, Appointment
+        from src.routes.user import USER_FIELDS
+        from src.routes.appointments import APPOINTMENT_FIELDS
+        from src.services import serialize
+
+        flask_json = DefaultJSONProvider(app)
+        fast_json = serialize.FastJSONProvider(app)
+        orjson = serialize.orjson
+
+        def users_to_dict():
+            users = User.query.order_by(User.id).all()
+            return flask_json.response({'users': [user.to_dict() for user in users]}).get_data()
+
+        def users_projection():
+            rows = USER_FIELDS.apply(User.query.order_by(User.id)).all()
+            return fast_json.response({'users': USER_FIELDS.dicts(rows)}).get_data()
+
+        def appointments_to_dict():
+            appointments = (Appointment.query.options(joinedload(Appointment.doctor))
+                            .order_by(Appointment.id).all())
+            result = []
+            for appointment in appointments:
+                appointment_dict = appointment.to_dict()
+                appointment_dict['doctor'] = appointment.doctor.to_dict() if appointment.doctor else None
+                result.append(appointment_dict)
+            return flask_json.response({'appointments': result}).get_data()
+
+        def appointments_projection():
+            rows = APPOINTMENT_FIELDS.apply(Appointment.query.outerjoin(Appointment.doctor)
+                                            .order_by(Appointment.id)).all()
+            return fast_json.response({'appointments': APPOINTMENT_FIELDS.dicts(rows)}).get_data()
+
+        print(f"{'listing':<12} {'to_dict':>9} {'projection':>12} {'+orjson':>10}")
+        with app.test_request_context():
+            for name, old, new in (('users', users_to_dict, users_projection),
+                                   ('appointments', appointments_to_dict, appointments_projection)):
+                # The session would otherwise hand back already loaded objects
+                db.session.expunge_all()
+                assert json.loads(old()) == json.loads(new()), f'{name}: bodies differ'
+                baseline = best_of(args.repeat, lambda: (db.session.expunge_all(), old()))
+                serialize.orjson = None
+                stdlib = best_of(args.repeat, new)
+                serialize.orjson = orjson
+                fast = best_of(args.repeat, new) if orjson is not None else float('nan')
+                print(f'{name:<12} {baseline:>6.1f} ms {stdlib:>9.1f} ms {fast:>7.1f} ms')
+            db.session.remove()
+        with app.app_context():
+            db.engine.dispose()
@@ -0,0 +1,116 @@
+import os
+import sqlite3
+
+from sqlalchemy import event
+
+from src.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.services.passwords import DEFAULT_MAX_QUEUE, DEFAULT_METHOD, DEFAULT_WORKERS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'database', 'app.db')}"
+
+# Applied to every new SQLite connection. WAL lets readers proceed while a
+# writer commits; busy_timeout makes writers wait for the lock instead of
+# failing with "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,  # KiB, i.e. ~20 MB of page cache
+    'mmap_size': 268435456,
+    'foreign_keys': 'ON',
+    'temp_store': 'MEMORY',
+}
+
+def _read_only_url(database_url):
+    """DATABASE_READ_URL, or the SQLite file opened with mode=ro"""
+    read_url = os.environ.get('DATABASE_READ_URL')
+    if read_url:
+        return read_url
+    if database_url.startswith('sqlite:///') and ':memory:' not in database_url and '?' not in database_url:
+        return f"sqlite:///file:{database_url[len('sqlite:///'):]}?mode=ro&uri=true"
+    return None
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+def _env_flag(name):
+    return os.environ.get(name, '').lower() in ('1', 'true', 'yes', 'on')
+
+def load_config():
+    """App configuration from the environment
+
+    DATABASE_URL selects the database (SQLite file by default) and
+    DATABASE_READ_URL a replica for read-only requests; without it a SQLite
+    file is also opened read-only for them.
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT and DB_POOL_RECYCLE tune
+    the pool of server databases; SQLITE_BUSY_TIMEOUT (ms) the SQLite wait.
+    WRITE_QUEUE_ENABLED sends order and appointment inserts through the
+    group-commit writer, batching for WRITE_QUEUE_WINDOW_MS (default 5).
+    METRICS_TOKEN, if set, is required as a bearer token by /metrics.
+    PAGE_SIZE is the page size of paginated listings without ``?limit=``
+    (default 20), MAX_PAGE_SIZE the largest ``?limit=`` honoured (100).
+    PASSWORD_HASH_METHOD sets the KDF of new hashes (werkzeug syntax, default
+    scrypt:32768:8:1; older hashes are upgraded on login), run by
+    PASSWORD_HASH_WORKERS threads with up to PASSWORD_HASH_MAX_QUEUE waiting.
+    TRUSTED_PROXIES is the number of reverse proxies in front of the app
+    whose X-Forwarded-For/-Proto entries are trusted (default 0: use the
+    socket's peer address, e.g. for per-IP rate limits).
+    """
+    database_url = os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL)
+    pragmas = dict(SQLITE_PRAGMAS, busy_timeout=_env_int('SQLITE_BUSY_TIMEOUT', SQLITE_PRAGMAS['busy_timeout']))
+
+    if database_url.startswith('sqlite'):
+        engine_options = {
+            'connect_args': {'timeout': pragmas['busy_timeout'] / 1000, 'check_same_thread': False},
+        }
+    else:
+        engine_options = {
+            'pool_size': _env_int('DB_POOL_SIZE', 10),
+            'max_overflow': _env_int('DB_MAX_OVERFLOW', 20),
+            'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+            'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+            'pool_pre_ping': True,
+        }
+
+    binds = {}
+    read_url = _read_only_url(database_url)
+    if read_url:
+        binds['readonly'] = read_url
+
+    return {
+        'SECRET_KEY': os.environ.get('SECRET_KEY', 'queencare_secret_key_2024'),
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'SQLALCHEMY_ENGINE_OPTIONS': engine_options,
+        'SQLALCHEMY_BINDS': binds,
+        'SQLITE_PRAGMAS': pragmas,
+        'WRITE_QUEUE_ENABLED': _env_flag('WRITE_QUEUE_ENABLED'),
+        'WRITE_QUEUE_WINDOW_MS': _env_int('WRITE_QUEUE_WINDOW_MS', 5),
+        'METRICS_TOKEN': os.environ.get('METRICS_TOKEN'),
+        'PAGE_SIZE': _env_int('PAGE_SIZE', DEFAULT_PAGE_SIZE),
+        'MAX_PAGE_SIZE': _env_int('MAX_PAGE_SIZE', MAX_PAGE_SIZE),
+        'PASSWORD_HASH_METHOD': os.environ.get('PASSWORD_HASH_METHOD') or DEFAULT_METHOD,
+        'PASSWORD_HASH_WORKERS': _env_int('PASSWORD_HASH_WORKERS', DEFAULT_WORKERS),
+        'PASSWORD_HASH_MAX_QUEUE': _env_int('PASSWORD_HASH_MAX_QUEUE', DEFAULT_MAX_QUEUE),
+        'TRUSTED_PROXIES': _env_int('TRUSTED_PROXIES', 0),
+    }
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run ``pragmas`` on every new DBAPI connection of a SQLite ``engine``"""
+    if engine.dialect.name != 'sqlite':
+        return
+    if engine.url.query.get('mode') == 'ro':
+        # Read-only connections can't change the journal mode or enforce FKs
+        pragmas = {name: value for name, value in pragmas.items() if name not in ('journal_mode', 'foreign_keys')}
+        pragmas['query_only'] = 'ON'
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
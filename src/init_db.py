@@ -1,10 +1,96 @@
-from src.models import db, Product, Doctor
+from src.models import db, Product, Doctor, Order, OrderItem, DataVersion
+from sqlalchemy import func, inspect, select
+from sqlalchemy.exc import IntegrityError
 import json
 
+# Duplicate keys listed per unique index that can't be created
+MAX_LISTED_DUPLICATES = 20
+
+class DuplicateRowsError(RuntimeError):
+    """Existing rows violate unique indexes; they need cleaning up first"""
+
+
+def missing_tables():
+    """Model tables the database lacks, i.e. whether init-db still has to run"""
+    existing = set(inspect(db.engine).get_table_names())
+    return [table.name for table in db.metadata.sorted_tables if table.name not in existing]
+
+def _duplicates(index):
+    """Key values that occur more than once, with their counts"""
+    columns = list(index.columns)
+    query = select(*columns, func.count()).group_by(*columns).having(func.count() > 1)
+    # Partial indexes only cover the rows matching their WHERE clause
+    where = index.dialect_kwargs.get(f'{db.engine.dialect.name}_where')
+    if where is not None:
+        query = query.where(where)
+    rows = db.session.execute(query.limit(MAX_LISTED_DUPLICATES))
+    return [(tuple(row[:-1]), row[-1]) for row in rows]
+
+def ensure_indexes():
+    """Create indexes declared on models that predate them (create_all skips existing tables)
+
+    Raises DuplicateRowsError listing the offending keys if existing rows
+    violate a unique index, after creating every other index.
+    """
+    failures = []
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=db.engine, checkfirst=True)
+            except IntegrityError as e:
+                lines = [f"{index.name} on {table.name}({', '.join(c.name for c in index.columns)}): {e.orig}"]
+                lines.extend(f"  {', '.join(map(repr, key))} appears {count} times"
+                             for key, count in _duplicates(index))
+                failures.append('\n'.join(lines))
+    if failures:
+        raise DuplicateRowsError('Existing rows violate unique indexes, remove the duplicates and run init-db again:\n'
+                                 + '\n'.join(failures))
+
+def ensure_data_versions():
+    """Create the shared change counter of every model that lacks one"""
+    existing = {name for (name,) in db.session.query(DataVersion.name)}
+    for mapper in db.Model.registry.mappers:
+        name = mapper.class_.__name__
+        if mapper.class_ is not DataVersion and name not in existing:
+            db.session.add(DataVersion(name=name))
+
+def migrate_order_items():
+    """Copy line items of orders that predate OrderItem out of products_json
+
+    An order is migrated only if every line's product still exists (the
+    product_id foreign key needs one); the others keep their lines in
+    products_json, which Order.get_products() falls back to.
+    """
+    orders = Order.query.filter(~Order.items.any()).all()
+    if not orders:
+        return
+    
+    product_ids = {product_id for (product_id,) in db.session.query(Product.id)}
+    migrated, kept = 0, []
+    for order in orders:
+        lines = json.loads(order.products_json or '[]')
+        if not lines or any(line.get('id') not in product_ids for line in lines):
+            kept.append(order.id)
+            continue
+        for line in lines:
+            order.items.append(OrderItem(
+                product_id=line['id'],
+                name=line.get('name') or '',
+                unit_price=float(line.get('price') or 0),
+                quantity=int(line.get('quantity') or 1)
+            ))
+        migrated += 1
+    
+    print(f"Migrated line items for {migrated} orders")
+    if kept:
+        print(f"Kept legacy line items of {len(kept)} orders with deleted or no products: {kept}")
+
 def init_database(app):
     """Initialize database with products and sample doctors"""
     # Create all tables
     db.create_all()
+    ensure_indexes()
+    ensure_data_versions()
     
     # Check if products already exist
     if Product.query.first():
@@ -162,6 +248,8 @@ def init_database(app):
     else:
         print("Database already initialized with doctors")
     
+    migrate_order_items()
+    
     # Commit all changes
     db.session.commit()
     print("Database initialization completed!")
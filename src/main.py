@@ -1,32 +1,72 @@
 import os
 import sys
+import time
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+import click
+from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from src.models import db, User, Product, Order, Doctor, Appointment
+from src.config import load_config, apply_sqlite_pragmas
+from src.models.routing import init_read_routing, route_blueprint
 from src.routes.user import user_bp
 from src.routes.auth import auth_bp
 from src.routes.products import products_bp
 from src.routes.orders import orders_bp
 from src.routes.appointments import appointments_bp
 from src.routes.articles import articles_bp
-from src.init_db import init_database
+from src.routes.batch import batch_bp
+from src.init_db import DuplicateRowsError, init_database
+from src.services.assets import asset_manifest
+from src.services.bulk_import import DEFAULT_CHUNK_SIZE, IMPORTERS, READERS, ImportFileError, import_file
+from src.services.compression import init_compression
+from src.services.metrics import init_metrics
+from src.services.serialize import FastJSONProvider
+from src.services.startup import PhaseTimer, phase
 
 def create_app():
+    """Build the app without touching the database or the filesystem
+
+    Run ``flask --app src.main init-db`` to create tables and seed data.
+    """
+    timer = PhaseTimer()
     app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-    app.config['SECRET_KEY'] = 'queencare_secret_key_2024'
+    app.config.from_mapping(load_config())
+    app.json = FastJSONProvider(app)
+    timer.mark('config')
+    
+    # Behind reverse proxies, take the client address from the hops they add
+    # to X-Forwarded-For, so per-IP limits don't see every client as the proxy
+    trusted_proxies = app.config['TRUSTED_PROXIES']
+    if trusted_proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies)
     
     # Enable CORS for all routes
     CORS(app)
     
-    # Database configuration
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Request latency, SQL and cache metrics at /metrics; registered first so
+    # the timing covers every other request hook
+    init_metrics(app)
     
-    # Initialize database
+    # Initialize database (URL, pool and SQLite pragmas come from load_config)
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            apply_sqlite_pragmas(engine, app.config['SQLITE_PRAGMAS'])
+    
+    # GET requests read through the read-only engine; auth reads follow its own
+    # writes (signup -> /me), so it stays on the primary
+    init_read_routing(app, db)
+    route_blueprint(auth_bp, 'primary')
+    
+    # Serve static files from the fingerprinted asset manifest
+    asset_manifest.init_app(app)
+    
+    # Gzip API responses, reusing compressed bodies of ETagged responses
+    init_compression(app)
+    timer.mark('extensions')
     
     # Register blueprints
     app.register_blueprint(user_bp, url_prefix='/api/users')
@@ -35,11 +75,38 @@ def create_app():
     app.register_blueprint(orders_bp, url_prefix='/api')
     app.register_blueprint(appointments_bp, url_prefix='/api')
     app.register_blueprint(articles_bp, url_prefix='/api')
+    app.register_blueprint(batch_bp, url_prefix='/api')
+    timer.mark('blueprints')
     
-    # Initialize database with products and doctors
-    with app.app_context():
-        init_database(app)
+    # Schema creation and seeding run on demand, never at startup
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create tables and indexes, migrate and seed the database."""
+        try:
+            with phase('init_database'):
+                init_database(app)
+        except DuplicateRowsError as e:
+            raise click.ClickException(str(e))
+    
+    @app.cli.command('import-data')
+    @click.argument('kind', type=click.Choice(sorted(IMPORTERS)))
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(sorted(READERS)), help='Defaults to the file extension.')
+    @click.option('--chunk-size', default=DEFAULT_CHUNK_SIZE, show_default=True)
+    @click.option('--dry-run', is_flag=True, help='Report the counts without writing.')
+    def import_data_command(kind, path, fmt, chunk_size, dry_run):
+        """Upsert products or doctors from a CSV, JSON or NDJSON file."""
+        started = time.perf_counter()
+        try:
+            counts = import_file(kind, path, fmt=fmt, chunk_size=chunk_size, dry_run=dry_run)
+        except ImportFileError as e:
+            raise click.ClickException(str(e))
+        for error in counts.pop('errors'):
+            click.echo(f'skipped {error}', err=True)
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        click.echo(f"{kind}: {summary} in {time.perf_counter() - started:.1f}s{' (dry run)' if dry_run else ''}")
     
+    timer.finish('create_app')
     return app
 
 app = create_app()
@@ -51,16 +118,18 @@ def serve(path):
     if static_folder_path is None:
             return "Static folder not configured", 404
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+    # Answered from the in-memory manifest, no filesystem checks per request
+    response = asset_manifest.response(path) if path != "" else None
+    if response is None:
+        response = asset_manifest.response('index.html')
+    if response is None:
+        return "index.html not found", 404
+    return response
 
 
 if __name__ == '__main__':
+    # The development server prepares the database itself
+    with app.app_context():
+        init_database(app)
     app.run(host='0.0.0.0', port=5000, debug=True)
 
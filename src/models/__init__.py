@@ -1,8 +1,10 @@
 from .user import db, User
 from .product import Product
 from .order import Order
+from .order_item import OrderItem
 from .doctor import Doctor
 from .appointment import Appointment
+from .data_version import DataVersion
 
-__all__ = ['db', 'User', 'Product', 'Order', 'Doctor', 'Appointment']
+__all__ = ['db', 'User', 'Product', 'Order', 'OrderItem', 'Doctor', 'Appointment', 'DataVersion']
 
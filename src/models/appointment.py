@@ -10,6 +10,15 @@ class Appointment(db.Model):
     status = db.Column(db.String(20), default='scheduled')  # scheduled, confirmed, completed, cancelled
     notes = db.Column(db.Text)  # Optional notes from user
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Keyset pagination of a user's appointments by (appointment_datetime, id)
+        db.Index('ix_appointment_user_datetime', 'user_id', 'appointment_datetime', 'id'),
+        # One active booking per doctor slot; cancelled appointments release it
+        db.Index('uq_appointment_doctor_slot', 'doctor_id', 'appointment_datetime', unique=True,
+                 sqlite_where=db.text("status != 'cancelled'"),
+                 postgresql_where=db.text("status != 'cancelled'")),
+    )
     
     def __repr__(self):
         return f'<Appointment {self.id} - User {self.user_id} with Doctor {self.doctor_id}>'
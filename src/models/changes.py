@@ -0,0 +1,73 @@
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from .data_version import DataVersion
+
+# Callbacks interested in committed row changes, see on_commit()
+_listeners = []
+
+def on_commit(callback):
+    """Register ``callback(changes)`` to run after every commit that touched rows.
+
+    ``changes`` maps a model name (e.g. ``'Product'``) to the set of primary
+    keys inserted, updated or deleted in the committed transaction.
+    """
+    _listeners.append(callback)
+    return callback
+
+def mark_changed(session, model_name, ids):
+    """Record changes made outside the unit of work (bulk statements)"""
+    pending = session.info.setdefault('changes', {})
+    pending.setdefault(model_name, set()).update(ids)
+    _bump_versions(session, pending)
+
+def _bump_versions(session, model_names):
+    """Increment the shared DataVersion rows within the session's transaction
+
+    Each model is bumped once per transaction, so the new version becomes
+    visible to other processes exactly when the changed rows do.
+    """
+    bumped = session.info.setdefault('bumped', set())
+    names = set(model_names) - bumped
+    if not names:
+        return
+    bumped.update(names)
+
+    table = DataVersion.__table__
+    connection = session.connection(bind_arguments={'mapper': DataVersion.__mapper__})
+    result = connection.execute(table.update().where(table.c.name.in_(names))
+                                .values(version=table.c.version + 1))
+    if result.rowcount < len(names):
+        # First write of a model since the table was created
+        existing = set(connection.execute(select(table.c.name).where(table.c.name.in_(names))).scalars())
+        connection.execute(table.insert(), [{'name': name} for name in sorted(names - existing)])
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault('changes', {})
+    for obj in session.new:
+        if not isinstance(obj, DataVersion):
+            pending.setdefault(type(obj).__name__, set()).add(obj.id)
+    for obj in session.deleted:
+        if not isinstance(obj, DataVersion):
+            pending.setdefault(type(obj).__name__, set()).add(obj.id)
+    for obj in session.dirty:
+        # Objects touched without a net column change don't count
+        if not isinstance(obj, DataVersion) and session.is_modified(obj, include_collections=False):
+            pending.setdefault(type(obj).__name__, set()).add(obj.id)
+    if pending:
+        _bump_versions(session, pending)
+
+@event.listens_for(Session, 'after_commit')
+def _dispatch_changes(session):
+    session.info.pop('bumped', None)
+    changes = session.info.pop('changes', None)
+    if not changes:
+        return
+    for callback in _listeners:
+        callback(changes)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('changes', None)
+    session.info.pop('bumped', None)
@@ -0,0 +1,20 @@
+from .user import db
+import os
+
+def initial_version():
+    """Random starting point, so a recreated table never repeats old versions"""
+    return int.from_bytes(os.urandom(4), 'big') >> 1
+
+class DataVersion(db.Model):
+    """Change counter per model, bumped in every transaction that writes its rows
+
+    Kept in the database so every process (server workers, CLI imports,
+    scripts) sees the same versions; see src.models.changes.
+    """
+    __tablename__ = 'data_version'
+
+    name = db.Column(db.String(50), primary_key=True)  # Model name, e.g. 'Product'
+    version = db.Column(db.BigInteger, nullable=False, default=initial_version)
+
+    def __repr__(self):
+        return f'<DataVersion {self.name} {self.version}>'
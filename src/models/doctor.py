@@ -10,6 +10,11 @@ class Doctor(db.Model):
     
     # Relationships
     appointments = db.relationship('Appointment', backref='doctor', lazy=True)
+
+    __table_args__ = (
+        # Natural key of roster imports
+        db.Index('uq_doctor_name', 'name', unique=True),
+    )
     
     def __repr__(self):
         return f'<Doctor {self.name} - {self.specialty}>'
@@ -5,19 +5,41 @@ import json
 class Order(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    products_json = db.Column(db.Text, nullable=False)  # JSON string of products
+    products_json = db.Column(db.Text, nullable=False)  # Legacy JSON copy of the line items
     total_price = db.Column(db.Float, nullable=False)  # Total in SYP
     payment_method = db.Column(db.String(50), nullable=False)  # Cash on delivery, Syriatel Cash, Bank Al Baraka
     status = db.Column(db.String(20), default='pending')  # pending, confirmed, shipped, delivered
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relationships
+    items = db.relationship('OrderItem', backref='order', lazy='selectin', cascade='all, delete-orphan')
+
+    __table_args__ = (
+        # Keyset pagination of a user's orders by (created_at, id)
+        db.Index('ix_order_user_created', 'user_id', 'created_at', 'id'),
+    )
     
     def set_products(self, products_list):
         """Set products as JSON string"""
         self.products_json = json.dumps(products_list)
     
     def get_products(self):
-        """Get products as Python list"""
-        return json.loads(self.products_json) if self.products_json else []
+        """Get line items as Python list
+
+        Legacy orders whose products were deleted before the move to
+        OrderItem only have their lines in products_json.
+        """
+        if self.items:
+            return [item.to_dict() for item in self.items]
+        return [
+            {
+                'id': line.get('id'),
+                'name': line.get('name') or '',
+                'price': float(line.get('price') or 0),
+                'quantity': int(line.get('quantity') or 1)
+            }
+            for line in json.loads(self.products_json or '[]')
+        ]
     
     def __repr__(self):
         return f'<Order {self.id} - User {self.user_id}>'
@@ -0,0 +1,26 @@
+from .user import db
+
+class OrderItem(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
+    name = db.Column(db.String(100), nullable=False)  # Product name at time of purchase
+    unit_price = db.Column(db.Float, nullable=False)  # Price in SYP at time of purchase
+    quantity = db.Column(db.Integer, nullable=False, default=1)
+
+    __table_args__ = (
+        db.Index('ix_order_item_order', 'order_id'),
+        # "Which orders contain product X"
+        db.Index('ix_order_item_product', 'product_id', 'order_id'),
+    )
+
+    def __repr__(self):
+        return f'<OrderItem {self.id} - Order {self.order_id} Product {self.product_id} x{self.quantity}>'
+
+    def to_dict(self):
+        return {
+            'id': self.product_id,
+            'name': self.name,
+            'price': self.unit_price,
+            'quantity': self.quantity
+        }
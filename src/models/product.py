@@ -1,5 +1,6 @@
 from .user import db
 from datetime import datetime
+from src.services.assets import asset_manifest
 
 class Product(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -9,6 +10,11 @@ class Product(db.Model):
     image_url = db.Column(db.String(255), nullable=False)
     category = db.Column(db.String(50), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Natural key of catalog imports
+        db.Index('uq_product_name', 'name', unique=True),
+    )
     
     def __repr__(self):
         return f'<Product {self.name}>'
@@ -19,7 +25,7 @@ class Product(db.Model):
             'name': self.name,
             'description': self.description,
             'price': self.price,
-            'image_url': self.image_url,
+            'image_url': asset_manifest.url(self.image_url),
             'category': self.category,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
@@ -0,0 +1,66 @@
+import re
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+# Bind key of the read-only engine in SQLALCHEMY_BINDS
+READ_BIND = 'readonly'
+READ_METHODS = {'GET', 'HEAD'}
+WRITE_STATEMENT = re.compile(r'^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b', re.IGNORECASE)
+
+# Blueprint name -> 'primary' or 'replica', see route_blueprint()
+_blueprint_routes = {}
+
+class ReadOnlyViolation(RuntimeError):
+    pass
+
+
+class RoutingSession(Session):
+    """Session that sends reads of read-only requests to the READ_BIND engine"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and has_request_context()
+                and g.get('db_read_only') and READ_BIND in self._db.engines):
+            return self._db.engines[READ_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_primary(view):
+    """Keep a GET view on the primary engine"""
+    view.db_route = 'primary'
+    return view
+
+def use_replica(view):
+    """Send every request of a view to the read-only engine"""
+    view.db_route = 'replica'
+    return view
+
+def route_blueprint(blueprint, route):
+    """Default engine ('primary' or 'replica') for a blueprint's views"""
+    _blueprint_routes[blueprint.name] = route
+
+def init_read_routing(app, db):
+    """Route GET/HEAD requests to the read-only engine, if one is configured"""
+    if READ_BIND not in app.config.get('SQLALCHEMY_BINDS', {}):
+        return
+
+    with app.app_context():
+        guard_read_only(db.engines[READ_BIND])
+
+    @app.before_request
+    def select_engine():
+        view = app.view_functions.get(request.endpoint)
+        route = getattr(view, 'db_route', None) or _blueprint_routes.get(request.blueprint)
+        if route is None:
+            route = 'replica' if request.method in READ_METHODS else 'primary'
+        if route == 'replica':
+            g.db_read_only = True
+            db.session.autoflush = False
+
+def guard_read_only(engine):
+    """Refuse write statements on ``engine``, whatever the backend allows"""
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _reject_writes(conn, cursor, statement, parameters, context, executemany):
+        if WRITE_STATEMENT.match(statement):
+            raise ReadOnlyViolation(f'Write issued on the read-only engine: {statement.split(None, 1)[0]}')
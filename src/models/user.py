@@ -1,8 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from .routing import RoutingSession
+from src.services.passwords import password_hasher
 from datetime import datetime
 
-db = SQLAlchemy()
+# Committed objects keep their values, serializing them after commit costs no SELECT
+db = SQLAlchemy(session_options={'class_': RoutingSession, 'expire_on_commit': False})
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -10,16 +12,24 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Keyset pagination of the user listing by (created_at, id)
+        db.Index('ix_user_created', 'created_at', 'id'),
+    )
     
     # Relationships
     orders = db.relationship('Order', backref='user', lazy=True)
     appointments = db.relationship('Appointment', backref='user', lazy=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f'<User {self.name}>'
@@ -1,10 +1,40 @@
 from flask import Blueprint, request, jsonify, session
 from src.models import db, Appointment, Doctor, User
-from datetime import datetime
+from src.services.cache import cached_view
+from src.services.etag import conditional_get
+from src.services.pagination import keyset_page, InvalidCursor
+from src.services.query_budget import query_budget
+from src.services.availability import free_slots, earliest_slots, in_schedule
+from src.services.rate_limit import rate_limit, Policy
+from src.services.write_queue import insert, WriteQueueFull
+from src.services.serialize import Projection
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, date
 
 appointments_bp = Blueprint('appointments', __name__)
 
+# Columns of Appointment.to_dict() with the doctor's, fetched as tuples for listings
+APPOINTMENT_FIELDS = Projection(
+    id=Appointment.id,
+    user_id=Appointment.user_id,
+    doctor_id=Appointment.doctor_id,
+    appointment_datetime=Appointment.appointment_datetime,
+    payment_method=Appointment.payment_method,
+    status=Appointment.status,
+    notes=Appointment.notes,
+    created_at=Appointment.created_at,
+    doctor=Projection(
+        id=Doctor.id,
+        name=Doctor.name,
+        specialty=Doctor.specialty,
+        available_times=Doctor.available_times,
+        created_at=Doctor.created_at
+    )
+)
+
 @appointments_bp.route('/appointments', methods=['POST'])
+@rate_limit(per_ip=Policy(per_minute=30), per_account=Policy(per_minute=10, capacity=5))
 def create_appointment():
     """Create a new appointment"""
     try:
@@ -34,53 +64,74 @@ def create_appointment():
         except ValueError:
             return jsonify({'error': 'Invalid datetime format'}), 400
         
-        # Create new appointment
-        appointment = Appointment(
-            user_id=session['user_id'],
-            doctor_id=data['doctor_id'],
-            appointment_datetime=appointment_dt,
-            payment_method=data['payment_method'],
-            notes=data.get('notes', '')
-        )
+        # Schedules are wall-clock times, compare without an offset
+        appointment_dt = appointment_dt.replace(tzinfo=None)
+        if not in_schedule(doctor, appointment_dt):
+            return jsonify({'error': 'Doctor is not available at this time'}), 400
+        if appointment_dt <= datetime.now():
+            return jsonify({'error': 'Appointment time must be in the future'}), 400
+        
+        user_id, doctor_id = session['user_id'], doctor.id
         
-        db.session.add(appointment)
-        db.session.commit()
+        def build(db_session):
+            # Create new appointment
+            appointment = Appointment(
+                user_id=user_id,
+                doctor_id=doctor_id,
+                appointment_datetime=appointment_dt,
+                payment_method=data['payment_method'],
+                notes=data.get('notes', '')
+            )
+            db_session.add(appointment)
+            return appointment
+        
+        try:
+            appointment = insert(build, Appointment.to_dict)
+        except IntegrityError:
+            # The unique slot index settles concurrent bookings
+            db.session.rollback()
+            return jsonify({'error': 'This time slot is already booked'}), 409
         
         return jsonify({
             'message': 'Appointment created successfully',
-            'appointment': appointment.to_dict()
+            'appointment': appointment
         }), 201
         
+    except WriteQueueFull as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @appointments_bp.route('/appointments', methods=['GET'])
+@conditional_get('Appointment', 'Doctor', per_user=True)
+@query_budget(1)
 def get_user_appointments():
-    """Get appointments for the current user"""
+    """Get appointments for the current user, latest first, one page per request"""
     try:
         # Check authentication
         if 'user_id' not in session:
             return jsonify({'error': 'Authentication required'}), 401
         
-        appointments = Appointment.query.filter_by(user_id=session['user_id']).order_by(Appointment.appointment_datetime.desc()).all()
-        
-        # Include doctor information
-        appointments_with_doctors = []
-        for appointment in appointments:
-            appointment_dict = appointment.to_dict()
-            doctor = Doctor.query.get(appointment.doctor_id)
-            appointment_dict['doctor'] = doctor.to_dict() if doctor else None
-            appointments_with_doctors.append(appointment_dict)
+        # Doctors come back in the same SELECT instead of one lookup per row
+        query = APPOINTMENT_FIELDS.apply(
+            Appointment.query.filter_by(user_id=session['user_id']).outerjoin(Doctor, Appointment.doctor_id == Doctor.id))
+        appointments, next_cursor = keyset_page(query, Appointment.appointment_datetime, Appointment.id)
         
         return jsonify({
-            'appointments': appointments_with_doctors
+            'appointments': APPOINTMENT_FIELDS.dicts(appointments),
+            'next_cursor': next_cursor
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @appointments_bp.route('/doctors', methods=['GET'])
+@conditional_get('Doctor')
+@cached_view(tags=lambda: ['Doctor:*'])
+@query_budget(1)
 def get_doctors():
     """Get all available doctors"""
     try:
@@ -93,6 +144,8 @@ def get_doctors():
         return jsonify({'error': str(e)}), 500
 
 @appointments_bp.route('/doctors/<int:doctor_id>', methods=['GET'])
+@conditional_get('Doctor')
+@cached_view(tags=lambda doctor_id: [f'Doctor:{doctor_id}'])
 def get_doctor(doctor_id):
     """Get a specific doctor by ID"""
     try:
@@ -102,3 +155,58 @@ def get_doctor(doctor_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@appointments_bp.route('/doctors/<int:doctor_id>/availability', methods=['GET'])
+def get_doctor_availability(doctor_id):
+    """Get a doctor's free time slots on a given date"""
+    try:
+        try:
+            day = date.fromisoformat(request.args.get('date', ''))
+        except ValueError:
+            return jsonify({'error': 'date must be given as YYYY-MM-DD'}), 400
+        
+        doctor = Doctor.query.get(doctor_id)
+        if not doctor:
+            return jsonify({'error': 'Doctor not found'}), 404
+        
+        return jsonify({
+            'doctor_id': doctor.id,
+            'date': day.isoformat(),
+            'slots': [slot.strftime('%H:%M') for slot in free_slots(doctor, day)]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@appointments_bp.route('/doctors/earliest-slots', methods=['GET'])
+def get_earliest_slots():
+    """Get the earliest free slots across all doctors of a specialty"""
+    try:
+        specialty = request.args.get('specialty', '').strip()
+        if not specialty:
+            return jsonify({'error': 'specialty is required'}), 400
+        
+        try:
+            first_day = date.fromisoformat(request.args['from']) if request.args.get('from') else date.today()
+        except ValueError:
+            return jsonify({'error': 'from must be given as YYYY-MM-DD'}), 400
+        days = max(1, min(request.args.get('days', 14, type=int), 60))
+        limit = max(1, min(request.args.get('limit', 5, type=int), 50))
+        
+        # Whole-name match: a substring would mix in other specialties
+        doctors = Doctor.query.filter(func.lower(Doctor.specialty) == specialty.lower()).all()
+        doctors_by_id = {doctor.id: doctor for doctor in doctors}
+        
+        return jsonify({
+            'slots': [
+                {
+                    'doctor_id': doctor_id,
+                    'doctor_name': doctors_by_id[doctor_id].name,
+                    'specialty': doctors_by_id[doctor_id].specialty,
+                    'appointment_datetime': slot.isoformat()
+                }
+                for slot, doctor_id in earliest_slots(doctors, first_day, days, limit)
+            ]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,433 +1,55 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request, current_app
+from src.services.etag import conditional_get
+from src.services.article_search import article_index
+from src.services.article_store import article_store
 
 articles_bp = Blueprint('articles', __name__)
 
-# Medical articles data
-ARTICLES = [
-    {
-        'id': 1,
-        'title': 'الفيلر: دليلك الشامل للحقن التجميلية',
-        'category': 'فيلر',
-        'summary': 'تعرفي على كل ما تحتاجين معرفته عن حقن الفيلر، أنواعها، فوائدها، والاحتياطات اللازمة',
-        'content': '''
-# الفيلر: دليلك الشامل للحقن التجميلية
+# Encoded JSON bodies by cache key, built once per process
+_payloads = {}
 
-## ما هو الفيلر؟
-
-الفيلر هو مادة طبية تُحقن تحت الجلد لملء التجاعيد والخطوط الدقيقة، وإعادة الحجم المفقود للوجه، وتحسين ملامح الوجه بشكل طبيعي. يُعتبر الفيلر من أكثر الإجراءات التجميلية غير الجراحية شيوعاً في العالم.
-
-## أنواع الفيلر
-
-### 1. حمض الهيالورونيك (Hyaluronic Acid)
-- الأكثر شيوعاً واستخداماً
-- مادة طبيعية موجودة في الجسم
-- نتائج مؤقتة تدوم 6-18 شهر
-- آمن وقابل للذوبان
-
-### 2. الكولاجين
-- مادة بروتينية طبيعية
-- يحفز إنتاج الكولاجين الطبيعي
-- نتائج تدوم 3-6 أشهر
-
-### 3. الكالسيوم هيدروكسيلاباتيت
-- مادة معدنية طبيعية
-- نتائج طويلة المدى
-- مناسب للتجاعيد العميقة
-
-## المناطق التي يُستخدم فيها الفيلر
-
-- **الشفاه**: لزيادة الحجم وتحديد الشكل
-- **الخدود**: لاستعادة الامتلاء والشباب
-- **تحت العينين**: لعلاج الهالات السوداء والانتفاخ
-- **الأنف**: لتصحيح الشكل بدون جراحة
-- **الذقن**: لتحسين التوازن والتناسق
-- **خطوط الضحك**: حول الفم والأنف
-
-## فوائد الفيلر
-
-1. **نتائج فورية**: تظهر النتائج مباشرة بعد الحقن
-2. **إجراء غير جراحي**: لا يتطلب تخدير عام أو فترة نقاهة طويلة
-3. **آمن**: عند إجرائه من قبل طبيب مختص
-4. **طبيعي**: يعطي مظهراً طبيعياً عند الحقن بالكمية المناسبة
-5. **قابل للتعديل**: يمكن إضافة المزيد أو إذابة الفيلر إذا لزم الأمر
-
-## الاحتياطات والآثار الجانبية
-
-### الآثار الجانبية الشائعة:
-- تورم خفيف في مكان الحقن
-- احمرار مؤقت
-- كدمات صغيرة
-- حساسية في المنطقة المعالجة
-
-### الاحتياطات:
-- اختيار طبيب مختص ومرخص
-- استخدام منتجات أصلية ومعتمدة
-- تجنب الحقن أثناء الحمل والرضاعة
-- إجراء اختبار حساسية قبل الحقن
-
-## نصائح ما بعد الحقن
-
-1. **تجنب اللمس**: لا تلمسي المنطقة المعالجة لمدة 6 ساعات
-2. **تجنب الحرارة**: ابتعدي عن الساونا والحمام الساخن لمدة 24 ساعة
-3. **تجنب الرياضة**: لا تمارسي الرياضة الشاقة لمدة 24 ساعة
-4. **النوم**: نامي على ظهرك لمدة ليلة واحدة
-5. **المتابعة**: راجعي الطبيب بعد أسبوعين للتقييم
-
-## متى تحتاجين لإعادة الحقن؟
-
-- حمض الهيالورونيك: كل 6-18 شهر
-- الكولاجين: كل 3-6 أشهر
-- المواد طويلة المدى: كل 1-2 سنة
-
-## الخلاصة
-
-الفيلر إجراء آمن وفعال لتحسين مظهر الوجه وعلاج علامات التقدم في السن. المفتاح هو اختيار طبيب مختص واستخدام منتجات عالية الجودة للحصول على أفضل النتائج.
-        ''',
-        'image_url': '/static/images/filler-article.jpg',
-        'date': '2024-01-15',
-        'author': 'د. ليلى أحمد - أخصائية الجلدية التجميلية'
-    },
-    {
-        'id': 2,
-        'title': 'البوتوكس: الحل الأمثل للتجاعيد التعبيرية',
-        'category': 'بوتوكس',
-        'summary': 'اكتشفي كيف يعمل البوتوكس في علاج التجاعيد وما هي الاستخدامات الطبية والتجميلية له',
-        'content': '''
-# البوتوكس: الحل الأمثل للتجاعيد التعبيرية
-
-## ما هو البوتوكس؟
-
-البوتوكس هو اسم تجاري لمادة البوتولينوم توكسين، وهو بروتين طبيعي يُستخرج من بكتيريا الكلوستريديوم بوتولينوم. يُستخدم طبياً منذ عقود لعلاج العديد من الحالات الطبية، وأصبح شائعاً في مجال التجميل لعلاج التجاعيد.
-
-## كيف يعمل البوتوكس؟
-
-يعمل البوتوكس عن طريق منع الإشارات العصبية من الوصول إلى العضلات، مما يؤدي إلى استرخاء العضلات المسؤولة عن تكوين التجاعيد التعبيرية. هذا الاسترخاء يجعل الجلد يبدو أكثر نعومة وشباباً.
-
-## المناطق التي يُعالجها البوتوكس
-
-### التجاعيد التعبيرية:
-- **خطوط الجبهة**: التجاعيد الأفقية في الجبين
-- **خطوط العبوس**: الخطوط العمودية بين الحاجبين
-- **أقدام الغراب**: التجاعيد حول العينين
-- **خطوط الأنف**: التجاعيد حول الأنف عند الضحك
-- **خطوط الرقبة**: التجاعيد الأفقية في الرقبة
-
-### الاستخدامات الطبية:
-- فرط التعرق (الإبطين، اليدين، القدمين)
-- الصداع النصفي المزمن
-- تشنجات العضلات
-- فرط نشاط المثانة
-
-## مميزات البوتوكس
-
-1. **إجراء سريع**: يستغرق 10-15 دقيقة فقط
-2. **غير مؤلم**: ألم خفيف جداً أثناء الحقن
-3. **لا يتطلب تخدير**: يمكن إجراؤه في العيادة
-4. **نتائج طبيعية**: عند الحقن بالكمية المناسبة
-5. **عودة فورية للأنشطة**: لا يتطلب فترة نقاهة
-
-## متى تظهر النتائج؟
-
-- **البداية**: 3-5 أيام بعد الحقن
-- **النتيجة الكاملة**: 10-14 يوم
-- **مدة الاستمرار**: 3-6 أشهر
-- **التحسن التدريجي**: مع الجلسات المتكررة
-
-## الآثار الجانبية المحتملة
-
-### آثار جانبية شائعة ومؤقتة:
-- احمرار خفيف في مكان الحقن
-- تورم بسيط
-- كدمات صغيرة
-- صداع خفيف
-
-### آثار جانبية نادرة:
-- تدلي الجفن (مؤقت)
-- عدم تماثل في الوجه
-- جفاف العين
-- صعوبة في البلع (عند حقن الرقبة)
-
-## من لا يناسبه البوتوكس؟
-
-- الحوامل والمرضعات
-- المصابون بأمراض عصبية عضلية
-- الذين يعانون من حساسية للبوتولينوم
-- المصابون بعدوى في مكان الحقن
-- من يتناولون أدوية مميعة للدم
-
-## نصائح قبل وبعد الحقن
-
-### قبل الحقن:
-- تجنبي الأسبرين ومميعات الدم لأسبوع
-- أخبري الطبيب عن جميع الأدوية التي تتناولينها
-- تجنبي الكحول قبل الحقن بيوم
-- لا تمارسي الرياضة قبل الحقن بيوم
-
-### بعد الحقن:
-- تجنبي الاستلقاء لمدة 4 ساعات
-- لا تمارسي الرياضة لمدة 24 ساعة
-- تجنبي التدليك في المنطقة المعالجة
-- ابتعدي عن الحرارة العالية لمدة 24 ساعة
-- تجنبي شرب الكحول لمدة 24 ساعة
-
-## التكلفة والجلسات
-
-- **التكلفة**: تختلف حسب المنطقة وعدد الوحدات المطلوبة
-- **عدد الجلسات**: جلسة واحدة كل 3-6 أشهر
-- **الوحدات المطلوبة**: 
-  - الجبهة: 10-20 وحدة
-  - بين الحاجبين: 10-25 وحدة
-  - حول العينين: 5-15 وحدة لكل جانب
-
-## نصائح لاختيار الطبيب المناسب
-
-1. **التخصص**: اختاري طبيب جلدية أو تجميل مختص
-2. **الخبرة**: تأكدي من خبرة الطبيب في حقن البوتوكس
-3. **الترخيص**: تأكدي من أن الطبيب مرخص ومعتمد
-4. **المنتج الأصلي**: تأكدي من استخدام البوتوكس الأصلي
-5. **النظافة**: تأكدي من نظافة العيادة والأدوات
-
-## الخلاصة
-
-البوتوكس علاج آمن وفعال للتجاعيد التعبيرية عند إجرائه من قبل طبيب مختص. النتائج طبيعية ومؤقتة، مما يجعله خياراً ممتازاً لمن يرغبن في تحسين مظهرهن دون اللجوء للجراحة.
-        ''',
-        'image_url': '/static/images/botox-article.jpg',
-        'date': '2024-01-10',
-        'author': 'د. عمر حسان - أخصائي الجلدية التجميلية'
-    },
-    {
-        'id': 3,
-        'title': 'العناية بالبشرة: دليلك الشامل للحصول على بشرة صحية',
-        'category': 'العناية بالبشرة',
-        'summary': 'تعلمي أساسيات العناية بالبشرة وكيفية اختيار المنتجات المناسبة لنوع بشرتك',
-        'content': '''
-# العناية بالبشرة: دليلك الشامل للحصول على بشرة صحية
-
-## مقدمة
-
-العناية بالبشرة ليست مجرد روتين جمالي، بل هي استثمار في صحة بشرتك على المدى الطويل. البشرة هي أكبر عضو في الجسم وتحتاج إلى عناية خاصة للحفاظ على صحتها ونضارتها.
-
-## أنواع البشرة
-
-### 1. البشرة الجافة
-**الخصائص:**
-- ملمس خشن ومتقشر
-- شعور بالشد والضيق
-- مسام صغيرة وغير واضحة
-- عرضة للتجاعيد المبكرة
-
-**العناية المطلوبة:**
-- مرطبات غنية وكثيفة
-- تجنب المنتجات الكحولية
-- استخدام زيوت طبيعية
-- شرب كمية كافية من الماء
-
-### 2. البشرة الدهنية
-**الخصائص:**
-- لمعان زائد خاصة في منطقة T
-- مسام واسعة وواضحة
-- عرضة لظهور الحبوب والرؤوس السوداء
-- ملمس دهني ولزج
-
-**العناية المطلوبة:**
-- منظفات لطيفة خالية من الزيوت
-- مرطبات خفيفة مائية القوام
-- استخدام أحماض مقشرة (BHA)
-- تجنب الإفراط في التنظيف
-
-### 3. البشرة المختلطة
-**الخصائص:**
-- دهنية في منطقة T (الجبهة والأنف والذقن)
-- جافة أو عادية في باقي المناطق
-- مسام متوسطة الحجم
-- تحتاج عناية مختلفة لكل منطقة
-
-**العناية المطلوبة:**
-- منتجات متوازنة
-- عناية مختلفة لكل منطقة
-- تونر متوازن
-- مرطب خفيف
-
-### 4. البشرة الحساسة
-**الخصائص:**
-- تتفاعل بسهولة مع المنتجات
-- احمرار وتهيج متكرر
-- حكة وحرقان
-- تحتاج منتجات لطيفة
-
-**العناية المطلوبة:**
-- منتجات خالية من العطور والكحول
-- اختبار المنتجات قبل الاستخدام
-- مكونات مهدئة مثل الألوة فيرا
-- تجنب التقشير القاسي
-
-## الروتين الأساسي للعناية بالبشرة
-
-### الروتين الصباحي
-
-#### 1. التنظيف
-- استخدمي منظف لطيف مناسب لنوع بشرتك
-- دلكي بحركات دائرية لطيفة
-- اشطفي بالماء الفاتر
-
-#### 2. التونر
-- يساعد على توازن درجة حموضة البشرة
-- يحضر البشرة لاستقبال المنتجات التالية
-- اختاري تونر خالي من الكحول
-
-#### 3. السيروم
-- فيتامين C للحماية من الأكسدة
-- حمض الهيالورونيك للترطيب
-- النياسيناميد لتوحيد لون البشرة
-
-#### 4. المرطب
-- ضروري لجميع أنواع البشرة
-- اختاري قوام مناسب لنوع بشرتك
-- يحافظ على حاجز البشرة الطبيعي
-
-#### 5. واقي الشمس
-- الخطوة الأهم في الروتين
-- SPF 30 أو أعلى
-- أعيدي التطبيق كل ساعتين
-
-### الروتين المسائي
-
-#### 1. إزالة المكياج
-- استخدمي زيت أو بلسم منظف
-- دلكي بلطف لإذابة المكياج
-- اشطفي بالماء الفاتر
-
-#### 2. التنظيف المضاعف
-- استخدمي منظف مائي بعد الزيت
-- ينظف بقايا الأوساخ والزيوت
-- يحضر البشرة للمنتجات التالية
-
-#### 3. التونر
-- نفس خطوات الصباح
-- يهدئ البشرة بعد التنظيف
-
-#### 4. العلاجات الليلية
-- الريتينول لمكافحة الشيخوخة
-- أحماض مقشرة (AHA/BHA)
-- سيروم مرطب مكثف
-
-#### 5. المرطب الليلي
-- أكثر كثافة من المرطب النهاري
-- يساعد على تجديد البشرة أثناء النوم
-
-## المكونات الفعالة في منتجات العناية
-
-### للترطيب:
-- **حمض الهيالورونيك**: يحتفظ بالرطوبة
-- **الجلسرين**: مرطب طبيعي
-- **السيراميد**: يقوي حاجز البشرة
-- **السكوالان**: زيت خفيف ومرطب
-
-### لمكافحة الشيخوخة:
-- **الريتينول**: يحفز تجديد الخلايا
-- **فيتامين C**: مضاد أكسدة قوي
-- **الببتيدات**: تحفز إنتاج الكولاجين
-- **النياسيناميد**: يحسن ملمس البشرة
-
-### للتقشير:
-- **أحماض الألفا هيدروكسي (AHA)**: للتقشير السطحي
-- **أحماض البيتا هيدروكسي (BHA)**: للمسام والحبوب
-- **أحماض البولي هيدروكسي (PHA)**: للبشرة الحساسة
-
-### للتهدئة:
-- **الألوة فيرا**: مهدئ ومرطب
-- **البابونج**: مضاد للالتهابات
-- **الشاي الأخضر**: مضاد أكسدة ومهدئ
-- **الأزولين**: يقلل الاحمرار
-
-## نصائح مهمة للعناية بالبشرة
-
-### 1. الصبر والثبات
-- النتائج تحتاج وقت (4-6 أسابيع)
-- الثبات على الروتين أهم من تغيير المنتجات
-- تجنبي تجربة منتجات كثيرة في نفس الوقت
-
-### 2. اختبار المنتجات
-- اختبري المنتج الجديد على منطقة صغيرة
-- انتظري 24-48 ساعة لمراقبة ردود الفعل
-- أدخلي منتج واحد جديد في كل مرة
-
-### 3. الحماية من الشمس
-- استخدمي واقي الشمس يومياً
-- ارتدي قبعة ونظارات شمسية
-- تجنبي التعرض المباشر للشمس
-
-### 4. نمط الحياة الصحي
-- اشربي كمية كافية من الماء
-- تناولي غذاء متوازن غني بالفيتامينات
-- احصلي على نوم كافي
-- مارسي الرياضة بانتظام
-
-### 5. تجنب العادات الضارة
-- لا تلمسي وجهك بأيدي غير نظيفة
-- تجنبي عصر الحبوب
-- غيري أكياس الوسائد بانتظام
-- نظفي هاتفك المحمول
-
-## الأخطاء الشائعة في العناية بالبشرة
-
-### 1. الإفراط في التنظيف
-- يؤدي إلى جفاف وتهيج البشرة
-- يحفز إنتاج الزيوت أكثر
-- مرتين يومياً كافية
-
-### 2. تجاهل الرقبة ومنطقة العينين
-- هذه المناطق تحتاج عناية خاصة
-- استخدمي منتجات مخصصة لها
-- طبقي واقي الشمس عليها أيضاً
-
-### 3. استخدام منتجات غير مناسبة
-- تعرفي على نوع بشرتك أولاً
-- اقرئي مكونات المنتجات
-- استشيري أخصائي إذا لزم الأمر
-
-### 4. عدم الصبر على النتائج
-- تغيير المنتجات بسرعة
-- توقع نتائج فورية
-- عدم إعطاء المنتج فرصة كافية
-
-## متى تستشيري طبيب الجلدية؟
-
-- ظهور حبوب شديدة أو مؤلمة
-- تغيرات في الشامات أو البقع
-- حساسية شديدة أو طفح جلدي
-- عدم تحسن البشرة رغم العناية المنتظمة
-- ظهور علامات شيخوخة مبكرة
-
-## الخلاصة
-
-العناية بالبشرة رحلة طويلة تتطلب صبراً وثباتاً. الأهم هو فهم نوع بشرتك واختيار المنتجات المناسبة لها. تذكري أن البساطة أفضل من التعقيد، والثبات أهم من الكمال.
-
-ابدئي بروتين بسيط واتركي بشرتك تتكيف، ثم أضيفي منتجات جديدة تدريجياً. مع الوقت والعناية المناسبة، ستحصلين على البشرة الصحية والنضرة التي تحلمين بها.
-        ''',
-        'image_url': '/static/images/skincare-article.jpg',
-        'date': '2024-01-05',
-        'author': 'د. فاطمة الزهراء - أخصائية العناية بالبشرة'
-    }
-]
+def _json_payload(key, build):
+    """Serve a JSON body that is encoded on first use and reused afterwards"""
+    body = _payloads.get(key)
+    if body is None:
+        body = _payloads.setdefault(key, current_app.json.dumps(build()).encode('utf-8'))
+    return current_app.response_class(body, mimetype='application/json')
 
 @articles_bp.route('/articles', methods=['GET'])
+@conditional_get()
 def get_articles():
-    """Get all medical articles"""
-    return jsonify({'articles': ARTICLES}), 200
+    """Get all medical articles (summary fields only)"""
+    return _json_payload('list', lambda: {'articles': article_store.summaries()}), 200
 
 @articles_bp.route('/articles/<int:article_id>', methods=['GET'])
+@conditional_get()
 def get_article(article_id):
-    """Get specific article by ID"""
-    article = next((a for a in ARTICLES if a['id'] == article_id), None)
-    if not article:
+    """Get specific article by ID, as Markdown or with ?format=html as rendered HTML"""
+    if not article_store.has(article_id):
         return jsonify({'error': 'Article not found'}), 404
     
-    return jsonify({'article': article}), 200
+    if request.args.get('format') == 'html':
+        return _json_payload(('article', article_id, 'html'), lambda: {'article': article_store.rendered(article_id)}), 200
+    
+    return _json_payload(('article', article_id), lambda: {'article': article_store.get(article_id)}), 200
 
 @articles_bp.route('/articles/category/<category>', methods=['GET'])
+@conditional_get()
 def get_articles_by_category(category):
-    """Get articles by category"""
-    filtered_articles = [a for a in ARTICLES if a['category'].lower() == category.lower()]
-    return jsonify({'articles': filtered_articles}), 200
-
+    """Get articles by category (summary fields only)"""
+    # Only known categories get a cached payload, so the cache stays bounded
+    if category.lower() not in article_store.categories():
+        return jsonify({'articles': []}), 200
+    
+    key = ('category', category.lower())
+    return _json_payload(key, lambda: {'articles': article_store.summaries(category)}), 200
+
+@articles_bp.route('/articles/search', methods=['GET'])
+def search_articles():
+    """Full-text search over articles, ranked by BM25"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'q is required'}), 400
+    
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    return jsonify({'query': query, 'results': article_index().search(query, limit)}), 200
@@ -1,10 +1,13 @@
 from flask import Blueprint, request, jsonify, session
 from src.models import db, User
-from werkzeug.security import check_password_hash
+from src.services.passwords import HasherBusy
+from src.services.rate_limit import rate_limit, email_account, Policy
+from src.services.cache import user_profiles
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/signup', methods=['POST'])
+@rate_limit(per_ip=Policy(per_minute=5))
 def signup():
     """User signup endpoint"""
     try:
@@ -32,16 +35,23 @@ def signup():
         session['user_id'] = user.id
         session['user_name'] = user.name
         
+        profile = user.to_dict()
+        user_profiles.set(user.id, profile, tags=[f'User:{user.id}'])
+        
         return jsonify({
             'message': 'User created successfully',
-            'user': user.to_dict()
+            'user': profile
         }), 201
         
+    except HasherBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit(per_ip=Policy(per_minute=20), per_account=Policy(per_minute=5), account=email_account)
 def login():
     """User login endpoint"""
     try:
@@ -57,15 +67,25 @@ def login():
         if not user or not user.check_password(data['password']):
             return jsonify({'error': 'Invalid email or password'}), 401
         
+        # Upgrade hashes made with outdated KDF parameters
+        if user.password_needs_rehash():
+            user.set_password(data['password'])
+            db.session.commit()
+        
         # Create session
         session['user_id'] = user.id
         session['user_name'] = user.name
         
+        profile = user.to_dict()
+        user_profiles.set(user.id, profile, tags=[f'User:{user.id}'])
+        
         return jsonify({
             'message': 'Login successful',
-            'user': user.to_dict()
+            'user': profile
         }), 200
         
+    except HasherBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -81,12 +101,19 @@ def get_current_user():
     if 'user_id' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
     
-    user = User.query.get(session['user_id'])
-    if not user:
-        session.clear()
-        return jsonify({'error': 'User not found'}), 404
+    # Profiles are cached per process and evicted when the User row commits
+    user_id = session['user_id']
+    profile = user_profiles.get(user_id)
+    if profile is None:
+        generation = user_profiles.generation
+        user = User.query.get(user_id)
+        if not user:
+            session.clear()
+            return jsonify({'error': 'User not found'}), 404
+        profile = user.to_dict()
+        user_profiles.set(user_id, profile, tags=[f'User:{user_id}'], generation=generation)
     
-    return jsonify({'user': user.to_dict()}), 200
+    return jsonify({'user': profile}), 200
 
 @auth_bp.route('/check-auth', methods=['GET'])
 def check_auth():
@@ -0,0 +1,75 @@
+from urllib.parse import urlsplit
+import sys
+
+from flask import Blueprint, request, jsonify, current_app
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+
+batch_bp = Blueprint('batch', __name__)
+
+MAX_BATCH_REQUESTS = 20
+# Headers of the batch request that are not passed on to its sub-requests
+DROPPED_HEADERS = {'content-type', 'content-length', 'accept-encoding', 'if-none-match', 'if-modified-since'}
+
+def _sub_response(path):
+    """Dispatch a GET for ``path`` through the app; returns ``(status, body)``
+
+    Each sub-request gets its own app and request context, so it is routed,
+    cached, budgeted and torn down exactly like a request of its own.
+    """
+    app = current_app._get_current_object()
+    url = urlsplit(path)
+    if url.scheme or url.netloc or not url.path.startswith('/api/') or url.path.rstrip('/') == '/api/batch':
+        return 400, jsonify({'error': 'Only /api/ paths can be batched'}).get_data()
+
+    headers = [(name, value) for name, value in request.headers if name.lower() not in DROPPED_HEADERS]
+    builder = EnvironBuilder(path=url.path, query_string=url.query, method='GET', headers=headers,
+                             environ_base={'REMOTE_ADDR': request.remote_addr})
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+
+    with app.app_context(), app.request_context(environ):
+        try:
+            # The SPA fallback would answer unknown API paths with index.html
+            if request.url_rule is None or request.url_rule.endpoint in ('serve', 'static'):
+                return 404, jsonify({'error': 'Not found'}).get_data()
+            response = app.full_dispatch_request()
+        except HTTPException as e:
+            return e.code, jsonify({'error': e.description}).get_data()
+        except Exception:
+            # Fail this item only; the other sub-responses still come back
+            app.log_exception(sys.exc_info())
+            return 500, jsonify({'error': 'Internal server error'}).get_data()
+        return response.status_code, response.get_data()
+
+@batch_bp.route('/batch', methods=['POST'])
+def batch():
+    """Run several GET requests in one round trip
+
+    The body is ``{"requests": [{"id": "products", "path": "/api/products"}, ...]}``
+    and the answer ``{"responses": [{"id": ..., "status": ..., "body": ...}]}`` in
+    the same order. ``id`` is optional and echoed back.
+    """
+    data = request.get_json(silent=True)
+    items = data.get('requests') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'requests must be a non-empty list'}), 400
+    if len(items) > current_app.config.get('BATCH_MAX_REQUESTS', MAX_BATCH_REQUESTS):
+        return jsonify({'error': 'Too many requests in one batch'}), 400
+    if not all(isinstance(item, dict) and isinstance(item.get('path'), str) for item in items):
+        return jsonify({'error': 'Each request needs a path'}), 400
+
+    # Sub-response bodies are already encoded JSON; splice them in as they are
+    encode = current_app.json.dumps
+    parts = []
+    for item in items:
+        status, body = _sub_response(item['path'])
+        body = body.strip() or b'null'
+        if not body.startswith((b'{', b'[')):
+            body = encode(body.decode('utf-8', 'replace')).encode('utf-8')
+        parts.append(b'{"id":%s,"status":%d,"body":%s}' % (encode(item.get('id')).encode('utf-8'), status, body))
+
+    payload = b'{"responses":[' + b','.join(parts) + b']}\n'
+    return current_app.response_class(payload, mimetype='application/json')
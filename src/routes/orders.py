@@ -1,9 +1,16 @@
 from flask import Blueprint, request, jsonify, session
-from src.models import db, Order, User, Product
+from src.models import db, Order, OrderItem, User, Product
+from src.services.etag import conditional_get
+from src.services.pagination import keyset_page, InvalidCursor
+from src.services.query_budget import query_budget
+from src.services.pricing import price_items, PricingError
+from src.services.rate_limit import rate_limit, Policy
+from src.services.write_queue import insert, WriteQueueFull
 
 orders_bp = Blueprint('orders', __name__)
 
 @orders_bp.route('/orders', methods=['POST'])
+@rate_limit(per_ip=Policy(per_minute=30), per_account=Policy(per_minute=10, capacity=5))
 def create_order():
     """Create a new order"""
     try:
@@ -14,52 +21,74 @@ def create_order():
         data = request.get_json()
         
         # Validate required fields
-        if not data or not data.get('products') or not data.get('total_price') or not data.get('payment_method'):
-            return jsonify({'error': 'Products, total_price, and payment_method are required'}), 400
+        if not data or not data.get('products') or not data.get('payment_method'):
+            return jsonify({'error': 'Products and payment_method are required'}), 400
         
         # Validate payment method
         valid_payment_methods = ['cash_on_delivery', 'syriatel_cash', 'bank_al_baraka']
         if data['payment_method'] not in valid_payment_methods:
             return jsonify({'error': 'Invalid payment method'}), 400
         
-        # Create new order
-        order = Order(
-            user_id=session['user_id'],
-            total_price=data['total_price'],
-            payment_method=data['payment_method']
-        )
-        order.set_products(data['products'])
+        # Price line items server-side, the client's total_price is not trusted
+        try:
+            items, total_price = price_items(data['products'])
+        except PricingError as e:
+            return jsonify({'error': str(e)}), 400
         
-        db.session.add(order)
-        db.session.commit()
+        user_id = session['user_id']
+        products = [item.to_dict() for item in items]
+        lines = [(item.product_id, item.name, item.unit_price, item.quantity) for item in items]
+        
+        def build(db_session):
+            # Fresh objects on every call: the group-commit writer replays
+            # a group after rolling back a failed job
+            order = Order(
+                user_id=user_id,
+                total_price=total_price,
+                payment_method=data['payment_method'],
+                items=[OrderItem(product_id=product_id, name=name, unit_price=unit_price, quantity=quantity)
+                       for product_id, name, unit_price, quantity in lines]
+            )
+            order.set_products(products)
+            db_session.add(order)
+            return order
         
         return jsonify({
             'message': 'Order created successfully',
-            'order': order.to_dict()
+            'order': insert(build, Order.to_dict)
         }), 201
         
+    except WriteQueueFull as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @orders_bp.route('/orders', methods=['GET'])
+@conditional_get('Order', per_user=True)
+@query_budget(2)
 def get_user_orders():
-    """Get orders for the current user"""
+    """Get orders for the current user, newest first, one page per request"""
     try:
         # Check authentication
         if 'user_id' not in session:
             return jsonify({'error': 'Authentication required'}), 401
         
-        orders = Order.query.filter_by(user_id=session['user_id']).order_by(Order.created_at.desc()).all()
+        query = Order.query.filter_by(user_id=session['user_id'])
+        orders, next_cursor = keyset_page(query, Order.created_at, Order.id)
         
         return jsonify({
-            'orders': [order.to_dict() for order in orders]
+            'orders': [order.to_dict() for order in orders],
+            'next_cursor': next_cursor
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @orders_bp.route('/orders/<int:order_id>', methods=['GET'])
+@conditional_get('Order', per_user=True)
 def get_order(order_id):
     """Get a specific order"""
     try:
@@ -1,27 +1,49 @@
 from flask import Blueprint, jsonify, request
-from src.models import db, Product
+from src.models import Product
+from src.services.catalog import catalog, SORT_KEYS
+from src.services.cache import cached_view
+from src.services.etag import conditional_get
 
 products_bp = Blueprint('products', __name__)
 
+def _price_arg(name):
+    """Parse an optional numeric price query argument"""
+    value = request.args.get(name)
+    return float(value) if value not in (None, '') else None
+
 @products_bp.route('/products', methods=['GET'])
+@conditional_get('Product')
 def get_products():
-    """Get all products"""
+    """Get products, optionally filtered by category/price range and sorted"""
     try:
         category = request.args.get('category')
+        sort = request.args.get('sort')
+        
+        if sort is not None and sort not in SORT_KEYS:
+            return jsonify({'error': f"Invalid sort, expected one of: {', '.join(SORT_KEYS)}"}), 400
         
-        if category:
-            products = Product.query.filter_by(category=category).all()
-        else:
-            products = Product.query.all()
+        try:
+            min_price = _price_arg('min_price')
+            max_price = _price_arg('max_price')
+        except ValueError:
+            return jsonify({'error': 'min_price and max_price must be numbers'}), 400
+        
+        # Served from the in-memory catalog snapshot, no SQL per request
+        snapshot = catalog.snapshot()
+        products, facets = snapshot.query(category=category, min_price=min_price, max_price=max_price, sort=sort)
         
         return jsonify({
-            'products': [product.to_dict() for product in products]
+            'products': products,
+            'facets': {'category': facets},
+            'version': snapshot.version
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @products_bp.route('/products/<int:product_id>', methods=['GET'])
+@conditional_get('Product')
+@cached_view(tags=lambda product_id: [f'Product:{product_id}'])
 def get_product(product_id):
     """Get a specific product by ID"""
     try:
@@ -32,13 +54,11 @@ def get_product(product_id):
         return jsonify({'error': str(e)}), 500
 
 @products_bp.route('/categories', methods=['GET'])
+@conditional_get('Product')
 def get_categories():
     """Get all product categories"""
     try:
-        categories = db.session.query(Product.category).distinct().all()
-        category_list = [category[0] for category in categories]
-        
-        return jsonify({'categories': category_list}), 200
+        return jsonify({'categories': list(catalog.snapshot().categories)}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
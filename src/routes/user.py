@@ -1,12 +1,23 @@
 from flask import Blueprint, jsonify, request
 from src.models.user import User, db
+from src.services.cache import cached_view
+from src.services.pagination import keyset_page, InvalidCursor
+from src.services.query_budget import query_budget
+from src.services.serialize import Projection
 
 user_bp = Blueprint('user', __name__)
 
+# Columns of User.to_dict(), fetched as tuples for listings
+USER_FIELDS = Projection(id=User.id, name=User.name, email=User.email, created_at=User.created_at)
+
 @user_bp.route('/users', methods=['GET'])
+@query_budget(1)
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    try:
+        users, next_cursor = keyset_page(USER_FIELDS.apply(User.query), User.created_at, User.id, descending=False)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'users': USER_FIELDS.dicts(users), 'next_cursor': next_cursor})
 
 @user_bp.route('/users', methods=['POST'])
 def create_user():
@@ -18,6 +29,7 @@ def create_user():
     return jsonify(user.to_dict()), 201
 
 @user_bp.route('/users/<int:user_id>', methods=['GET'])
+@cached_view(tags=lambda user_id: [f'User:{user_id}'])
 def get_user(user_id):
     user = User.query.get_or_404(user_id)
     return jsonify(user.to_dict())
@@ -26,7 +38,7 @@ def get_user(user_id):
 def update_user(user_id):
     user = User.query.get_or_404(user_id)
     data = request.json
-    user.username = data.get('username', user.username)
+    user.name = data.get('name', user.name)
     user.email = data.get('email', user.email)
     db.session.commit()
     return jsonify(user.to_dict())
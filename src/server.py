@@ -0,0 +1,254 @@
+"""Pre-forking production server
+
+    python -m src.server [--bind 0.0.0.0:5000] [--workers N] [--max-requests 10000]
+
+The master process imports the app, opens the listening socket and forks
+``--workers`` processes that accept on it, each serving requests on a pool
+of threads. Before forking, the master only checks that the schema is
+current (``flask --app src.main init-db`` has run) and refuses to start
+otherwise; workers drop any engine state inherited across the fork, so
+every connection is opened in the process that uses it.
+
+A worker exits after ``--max-requests`` requests (plus up to
+``--max-requests-jitter`` so workers don't restart together) and is
+replaced. SIGTERM or SIGINT stops accepting, lets in-flight requests finish
+for up to ``--graceful-timeout`` seconds, then kills what is left.
+Connections are closed after each response (HTTP/1.0); keep-alive to
+clients belongs in the reverse proxy in front. Set TRUSTED_PROXIES to the
+number of proxies so client addresses come from X-Forwarded-For.
+
+What each worker keeps in memory is its own. ETags, cached responses and
+the catalog snapshot are checked against the data versions shared in the
+database, so they agree across workers. Two things are not:
+
+- /api/auth/me profiles (user_profiles) are dropped only by the worker that
+  committed the change. Other workers serve the old profile until the
+  entry's TTL runs out.
+- Rate-limit buckets are per worker, so a client spread over N workers may
+  get up to N times a policy's rate.
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+logger = logging.getLogger('queencare.server')
+
+# A worker that dies sooner than this after starting is restarted with a delay
+MIN_WORKER_LIFETIME = 1.0
+
+class RequestHandler(WSGIRequestHandler):
+    protocol_version = 'HTTP/1.0'
+    # Seconds a client may stall while sending its request
+    timeout = 30
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+def parse_bind(bind):
+    host, _, port = bind.rpartition(':')
+    return host or '0.0.0.0', int(port)
+
+def check_schema(app):
+    """Exit with a hint instead of serving 500s from an unmigrated database"""
+    from src.init_db import missing_tables
+    from src.models import db
+
+    with app.app_context():
+        try:
+            missing = missing_tables()
+        finally:
+            for engine in db.engines.values():
+                engine.dispose()
+    if missing:
+        sys.exit(f"Database schema is out of date (missing tables: {', '.join(missing)}). "
+                 f"Run 'flask --app src.main init-db' first.")
+
+def listen(host, port, backlog=2048):
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.create_server((host, port), family=family, backlog=backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Worker:
+    """One forked process serving the shared socket until told to stop"""
+
+    def __init__(self, app, sock, max_requests, threads):
+        self.app = app
+        self.sock = sock
+        self.max_requests = max_requests
+        self.threads = threads
+        self._counter = itertools.count(1)
+        self._stopping = threading.Event()
+        self._slots = threading.BoundedSemaphore(threads)
+        self.server = None
+
+    def reset_after_fork(self):
+        """Forget connections and cached state the master may have created"""
+        from src.models import db
+        from src.services.cache import response_cache, user_profiles
+        from src.services.catalog import catalog
+        from src.services.compression import compressed_cache
+
+        with self.app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+        for cache in (response_cache, user_profiles, compressed_cache):
+            cache.clear()
+        catalog.invalidate()
+
+    def stop(self, *args):
+        if self.server is None:
+            raise SystemExit(0)
+        if not self._stopping.is_set():
+            self._stopping.set()
+            # shutdown() waits for serve_forever, which runs on this very thread
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    def wsgi(self, environ, start_response):
+        # Each connection gets a thread; at most ``threads`` of them run the app at once
+        with self._slots:
+            try:
+                return self.app(environ, start_response)
+            finally:
+                if self.max_requests and next(self._counter) == self.max_requests:
+                    logger.info('worker %d served %d requests, recycling', os.getpid(), self.max_requests)
+                    self.stop()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.reset_after_fork()
+
+        host, port = self.sock.getsockname()[:2]
+        self.server = make_server(host, port, self.wsgi, threaded=True,
+                                  request_handler=RequestHandler, fd=self.sock.fileno())
+        # server_close() then waits for in-flight requests
+        self.server.daemon_threads = False
+        self.server.serve_forever()
+
+
+class Master:
+    """Keeps ``workers`` processes alive and stops them gracefully"""
+
+    def __init__(self, app, sock, workers, max_requests, max_requests_jitter, threads, graceful_timeout):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.threads = threads
+        self.graceful_timeout = graceful_timeout
+        self.children = {}  # pid -> start time
+        self.stopping = False
+
+    def spawn(self):
+        max_requests = self.max_requests
+        if max_requests and self.max_requests_jitter:
+            max_requests += random.randint(0, self.max_requests_jitter)
+
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return
+
+        # Child: serve until stopped, never return into the master's loop
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        status = 0
+        try:
+            random.seed()
+            Worker(self.app, self.sock, max_requests, self.threads).run()
+        except BaseException:
+            logger.exception('worker %d crashed', os.getpid())
+            status = 1
+        finally:
+            logging.shutdown()
+            os._exit(status)
+
+    def stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info('stopping %d workers', len(self.children))
+        self.sock.close()
+        self._signal_children(signal.SIGTERM)
+        signal.signal(signal.SIGALRM, self.kill)
+        signal.alarm(max(1, int(self.graceful_timeout)))
+
+    def kill(self, signum, frame):
+        logger.warning('graceful timeout, killing %d workers', len(self.children))
+        self._signal_children(signal.SIGKILL)
+
+    def _signal_children(self, signum):
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info('listening on %s:%s with %d workers', *self.sock.getsockname()[:2], self.workers)
+
+        for _ in range(self.workers):
+            self.spawn()
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0:
+                logger.warning('worker %d exited with %d', pid, code)
+            if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                time.sleep(MIN_WORKER_LIFETIME)
+            if not self.stopping:
+                self.spawn()
+        signal.alarm(0)
+        logger.info('all workers stopped')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the app on pre-forked worker processes.')
+    parser.add_argument('--bind', default=os.environ.get('BIND', '0.0.0.0:5000'), help='host:port')
+    parser.add_argument('--workers', type=int, default=_env_int('WEB_CONCURRENCY', os.cpu_count() or 1))
+    parser.add_argument('--threads', type=int, default=_env_int('WORKER_THREADS', 8),
+                        help='concurrent requests per worker')
+    parser.add_argument('--max-requests', type=int, default=_env_int('MAX_REQUESTS', 10000),
+                        help='recycle a worker after this many requests, 0 never')
+    parser.add_argument('--max-requests-jitter', type=int, default=_env_int('MAX_REQUESTS_JITTER', 1000))
+    parser.add_argument('--graceful-timeout', type=float, default=_env_int('GRACEFUL_TIMEOUT', 30))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s')
+
+    # Imported before forking so workers share the loaded code; create_app does no I/O
+    from src.main import app
+    check_schema(app)
+
+    sock = listen(*parse_bind(args.bind))
+    Master(app, sock, args.workers, args.max_requests, args.max_requests_jitter,
+           args.threads, args.graceful_timeout).run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+from functools import lru_cache
+import heapq
+import math
+import re
+
+from markupsafe import Markup, escape
+
+from src.services.article_store import article_store
+from src.services.markdown import plain_text
+from src.services.startup import phase
+
+# Harakat, superscript alef and Quranic marks
+DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]')
+TATWEEL = '\u0640'
+LETTER_VARIANTS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي',
+    'ؤ': 'و',
+    'ة': 'ه',
+})
+# Words may carry diacritics/tatweel, which \w alone would split on
+TOKEN = re.compile('[\\w\u0610-\u061a\u0640\u064b-\u065f\u0670]+')
+
+DEFINITE_ARTICLES = ('وال', 'بال', 'كال', 'فال', 'لل', 'ال')
+SUFFIXES = ('ها', 'ان', 'ات', 'ون', 'ين', 'يه', 'ه', 'ي')
+
+# Field weights, applied as repeated term frequency
+FIELD_BOOSTS = (('title', 3), ('summary', 2), ('content', 1))
+K1 = 1.5
+B = 0.75
+SNIPPET_CONTEXT = 80
+
+def normalize(text):
+    """Strip diacritics and tatweel, unify alef/ya/ta-marbuta variants"""
+    text = DIACRITICS.sub('', text).replace(TATWEEL, '')
+    return text.translate(LETTER_VARIANTS).lower()
+
+def stem(token):
+    """Light (Light10-style) Arabic stemming: drop common prefixes and suffixes"""
+    if len(token) >= 4 and token.startswith('و'):
+        token = token[1:]
+    for prefix in DEFINITE_ARTICLES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+            token = token[len(prefix):]
+            break
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            token = token[:-len(suffix)]
+    return token
+
+def analyze(text):
+    """Yield ``(start, end, term)`` for every word of ``text``"""
+    for match in TOKEN.finditer(text):
+        term = stem(normalize(match.group()))
+        if term.strip('_'):
+            yield match.start(), match.end(), term
+
+
+class ArticleIndex:
+    """Inverted index over articles with BM25 ranking"""
+
+    def __init__(self, articles):
+        self.articles = list(articles)
+        self.postings = {}  # term -> {doc index: weighted tf}
+        self.lengths = []
+        # Content without Markdown syntax and its word offsets, for snippets
+        self.texts = []
+        self.positions = []
+
+        for doc, article in enumerate(self.articles):
+            length = 0
+            for field, boost in FIELD_BOOSTS:
+                text = article.get(field) or ''
+                if field == 'content':
+                    text = plain_text(text)
+                    self.texts.append(text)
+                words = list(analyze(text))
+                if field == 'content':
+                    self.positions.append(words)
+                for _, _, term in words:
+                    postings = self.postings.setdefault(term, {})
+                    postings[doc] = postings.get(doc, 0) + boost
+                length += len(words) * boost
+            self.lengths.append(length)
+
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0
+        count = len(self.articles)
+        self.idf = {
+            term: math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def search(self, query, limit=10):
+        """Rank articles for ``query``; returns dicts with score and snippet"""
+        terms = {term for _, _, term in analyze(query)}
+        scores = {}
+        for term in terms:
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc, tf in self.postings[term].items():
+                norm = K1 * (1 - B + B * self.lengths[doc] / self.avg_length)
+                scores[doc] = scores.get(doc, 0) + idf * tf * (K1 + 1) / (tf + norm)
+
+        results = []
+        for doc, score in heapq.nlargest(limit, scores.items(), key=lambda item: item[1]):
+            article = self.articles[doc]
+            results.append({
+                'id': article['id'],
+                'title': article['title'],
+                'category': article['category'],
+                'summary': article['summary'],
+                'score': round(score, 4),
+                'snippet': self.snippet(doc, terms),
+            })
+        return results
+
+    def snippet(self, doc, terms):
+        """Escaped excerpt around the first content hit, matches wrapped in <mark>"""
+        content = self.texts[doc]
+        words = self.positions[doc]
+        first = next((i for i, (_, _, term) in enumerate(words) if term in terms), None)
+        if first is None:
+            return str(escape(self.articles[doc]['summary']))
+
+        start = max(0, words[first][0] - SNIPPET_CONTEXT)
+        end = min(len(content), words[first][1] + SNIPPET_CONTEXT)
+        parts = []
+        cursor = start
+        for word_start, word_end, term in words[first:]:
+            if word_end > end:
+                break
+            if term in terms:
+                parts.append(escape(content[cursor:word_start]))
+                parts.append(Markup('<mark>%s</mark>') % content[word_start:word_end])
+                cursor = word_end
+        parts.append(escape(content[cursor:end]))
+
+        text = ' '.join(str(Markup('').join(parts)).split())
+        prefix = '…' if start > 0 else ''
+        suffix = '…' if end < len(content) else ''
+        return f'{prefix}{text}{suffix}'
+
+
+@lru_cache(maxsize=1)
+def article_index():
+    """Index over all articles, built on first use"""
+    with phase('article_index'):
+        return ArticleIndex(article_store.all())
@@ -0,0 +1,76 @@
+import json
+import os
+import threading
+
+from src.services.markdown import render_cached
+
+ARTICLES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'content', 'articles')
+SUMMARY_FIELDS = ('id', 'title', 'category', 'summary')
+
+class ArticleStore:
+    """Article metadata from ``index.json``, Markdown bodies from ``<id>.md``
+
+    Nothing is read until first use, and each body is read once when its
+    article is first requested.
+    """
+
+    def __init__(self, directory=ARTICLES_DIR):
+        self.directory = directory
+        self._metadata = None
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def metadata(self):
+        """Article metadata (no bodies) in publication order"""
+        if self._metadata is None:
+            with self._lock:
+                if self._metadata is None:
+                    with open(os.path.join(self.directory, 'index.json'), encoding='utf-8') as f:
+                        self._metadata = {article['id']: article for article in json.load(f)}
+        return list(self._metadata.values())
+
+    def summaries(self, category=None):
+        """Summary projection for listings, optionally for one category"""
+        return [
+            {field: article[field] for field in SUMMARY_FIELDS}
+            for article in self.metadata()
+            if category is None or article['category'].lower() == category.lower()
+        ]
+
+    def has(self, article_id):
+        self.metadata()
+        return article_id in self._metadata
+
+    def categories(self):
+        """Lower-cased category names"""
+        return {article['category'].lower() for article in self.metadata()}
+
+    def content(self, article_id):
+        body = self._bodies.get(article_id)
+        if body is None:
+            with open(os.path.join(self.directory, f'{article_id}.md'), encoding='utf-8') as f:
+                body = self._bodies.setdefault(article_id, f.read())
+        return body
+
+    def get(self, article_id):
+        """Full article including its body, or None"""
+        self.metadata()
+        article = self._metadata.get(article_id)
+        if article is None:
+            return None
+        return dict(article, content=self.content(article_id))
+
+    def rendered(self, article_id):
+        """Article with sanitized ``html`` and ``toc`` in place of the Markdown body"""
+        article = self.get(article_id)
+        if article is None:
+            return None
+        html, toc = render_cached(article.pop('content'))
+        return dict(article, html=html, toc=toc)
+
+    def all(self):
+        """Every article with its body (loads all bodies)"""
+        return [self.get(article['id']) for article in self.metadata()]
+
+
+article_store = ArticleStore()
@@ -0,0 +1,141 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+from flask import current_app, request, send_file
+
+from src.services.startup import phase
+
+# Text assets are kept in memory together with a pre-compressed gzip body
+COMPRESSIBLE = {'.css', '.js', '.html', '.svg', '.ico', '.json', '.txt'}
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+STATIC_REF = re.compile(r'''((?:href|src)=["'])/static/([^"'?#]+)''')
+
+class Asset:
+    __slots__ = ('path', 'logical', 'hashed', 'etag', 'mimetype', 'body', 'gzip_body')
+
+    def __init__(self, path, logical, digest):
+        self.path = path
+        self.logical = logical
+        root, ext = os.path.splitext(logical)
+        self.hashed = f'{root}.{digest[:12]}{ext}'
+        self.etag = digest[:32]
+        self.mimetype = mimetypes.guess_type(logical)[0] or 'application/octet-stream'
+        self.body = None
+        self.gzip_body = None
+
+    def set_body(self, body):
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        self.gzip_body = compressed if len(compressed) < len(body) else None
+
+
+class AssetManifest:
+    """In-memory map of the static folder to content-hashed file names
+
+    ``images/Shampoo.jpg`` is also served as ``images/Shampoo.<hash>.jpg``
+    with far-future immutable caching; the plain name stays revalidated.
+    The folder is scanned once on first use, so requests never stat files
+    to find out whether they exist.
+    """
+
+    def __init__(self):
+        self.folder = None
+        self._assets = None
+        self._hashed = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.folder = app.static_folder
+        if app.has_static_folder:
+            app.view_functions['static'] = self.serve_static
+
+    def _build(self):
+        assets = {}
+        for directory, _, files in os.walk(self.folder):
+            for name in files:
+                path = os.path.join(directory, name)
+                logical = os.path.relpath(path, self.folder).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    data = f.read()
+                asset = Asset(path, logical, hashlib.sha256(data).hexdigest())
+                if os.path.splitext(name)[1].lower() in COMPRESSIBLE:
+                    asset.body = data
+                assets[logical] = asset
+
+        # HTML pages reference the fingerprinted URLs of their assets
+        for asset in assets.values():
+            if asset.body is not None:
+                if asset.mimetype == 'text/html':
+                    html = asset.body.decode('utf-8')
+                    html = STATIC_REF.sub(lambda m: m.group(1) + self._url(assets, m.group(2)), html)
+                    asset.set_body(html.encode('utf-8'))
+                else:
+                    asset.set_body(asset.body)
+
+        self._hashed = {asset.hashed: asset for asset in assets.values()}
+        self._assets = assets
+
+    def _ensure(self):
+        if self._assets is None:
+            with self._lock:
+                if self._assets is None:
+                    with phase('asset_manifest'):
+                        self._build()
+        return self._assets
+
+    @staticmethod
+    def _url(assets, logical):
+        asset = assets.get(logical)
+        return f'/static/{asset.hashed if asset else logical}'
+
+    def url(self, url):
+        """Fingerprinted URL for a ``/static/...`` URL, or ``url`` unchanged"""
+        if self.folder is None or not url or not url.startswith('/static/'):
+            return url
+        return self._url(self._ensure(), url[len('/static/'):])
+
+    def response(self, path):
+        """Response for a path relative to the static folder, or None if unknown"""
+        assets = self._ensure()
+        asset = self._hashed.get(path)
+        immutable = asset is not None
+        if asset is None:
+            asset = assets.get(path)
+            if asset is None:
+                return None
+
+        if asset.body is None:
+            response = send_file(asset.path, mimetype=asset.mimetype, etag=asset.etag,
+                                 conditional=True, max_age=IMMUTABLE_MAX_AGE if immutable else 0)
+        else:
+            body, etag = asset.body, asset.etag
+            if asset.gzip_body is not None and 'gzip' in request.accept_encodings:
+                body, etag = asset.gzip_body, f'{asset.etag}-gz'
+            response = current_app.response_class(body, mimetype=asset.mimetype)
+            if body is asset.gzip_body:
+                response.headers['Content-Encoding'] = 'gzip'
+            if asset.gzip_body is not None:
+                response.vary.add('Accept-Encoding')
+            response.set_etag(etag)
+            response = response.make_conditional(request)
+
+        if immutable:
+            response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def serve_static(self, filename):
+        """Replacement for Flask's ``static`` view"""
+        response = self.response(filename)
+        if response is None:
+            return 'Not Found', 404
+        return response
+
+
+asset_manifest = AssetManifest()
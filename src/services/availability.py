@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, time
+from functools import lru_cache
+from itertools import islice
+import heapq
+import json
+
+from src.models import Appointment
+
+# Appointments in these states don't hold their slot
+RELEASED_STATUSES = ('cancelled',)
+
+@lru_cache(maxsize=256)
+def parse_schedule(available_times):
+    """Parse a Doctor.available_times JSON list of "HH:MM" into sorted times
+
+    Memoized on the raw column value, so an edited schedule is simply a new key.
+    """
+    return tuple(sorted(time.fromisoformat(t) for t in json.loads(available_times or '[]')))
+
+def in_schedule(doctor, when):
+    """Whether ``when`` falls on one of the doctor's daily slots"""
+    return when.time() in parse_schedule(doctor.available_times)
+
+def booked_slots(doctor_ids, start, end):
+    """Map doctor id -> set of booked datetimes in [start, end)
+
+    One range query served by the (doctor_id, appointment_datetime) index.
+    """
+    rows = (Appointment.query
+            .with_entities(Appointment.doctor_id, Appointment.appointment_datetime)
+            .filter(Appointment.doctor_id.in_(doctor_ids),
+                    Appointment.appointment_datetime >= start,
+                    Appointment.appointment_datetime < end,
+                    Appointment.status.notin_(RELEASED_STATUSES))
+            .all())
+    booked = {doctor_id: set() for doctor_id in doctor_ids}
+    for doctor_id, when in rows:
+        booked[doctor_id].add(when)
+    return booked
+
+def slot_stream(doctor, first_day, days, booked, now):
+    """Lazily yield ``(slot, doctor_id)`` for the doctor's open slots in order"""
+    schedule = parse_schedule(doctor.available_times)
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        for t in schedule:
+            slot = datetime.combine(day, t)
+            if slot > now and slot not in booked:
+                yield slot, doctor.id
+
+def free_slots(doctor, day, now=None):
+    """Open, future slots for ``doctor`` on ``day`` in chronological order"""
+    now = now or datetime.now()
+    start = datetime.combine(day, time.min)
+    booked = booked_slots([doctor.id], start, start + timedelta(days=1))[doctor.id]
+    return [slot for slot, _ in slot_stream(doctor, day, 1, booked, now)]
+
+def earliest_slots(doctors, first_day, days, limit, now=None):
+    """The ``limit`` earliest open ``(slot, doctor_id)`` pairs across ``doctors``
+
+    The window is walked in chunks of 1, 2, 4, ... days. Each chunk fetches
+    its bookings in one query, then the per-doctor slot streams are k-way
+    merged and cut off once ``limit`` items are found, so an early answer
+    never loads the bookings of the rest of the window.
+    """
+    if not doctors:
+        return []
+    now = now or datetime.now()
+    doctor_ids = [d.id for d in doctors]
+    slots = []
+    offset, span = 0, 1
+    while offset < days and len(slots) < limit:
+        span = min(span, days - offset)
+        chunk_day = first_day + timedelta(days=offset)
+        start = datetime.combine(chunk_day, time.min)
+        booked = booked_slots(doctor_ids, start, start + timedelta(days=span))
+        streams = [slot_stream(d, chunk_day, span, booked[d.id], now) for d in doctors]
+        slots.extend(islice(heapq.merge(*streams), limit - len(slots)))
+        offset += span
+        span *= 2
+    return slots
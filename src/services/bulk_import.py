@@ -0,0 +1,251 @@
+from datetime import datetime
+from itertools import islice
+import csv
+import io
+import json
+import os
+
+from sqlalchemy import insert, select, update
+
+from src.models import db, Product, Doctor
+from src.models.changes import mark_changed
+
+DEFAULT_CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 20
+READ_SIZE = 1 << 16
+
+class ImportFileError(ValueError):
+    pass
+
+
+class RowError(ValueError):
+    pass
+
+
+# Readers: each yields (line_or_position, record dict) without loading the whole file
+
+def _read_csv(f):
+    reader = csv.DictReader(f)
+    for record in reader:
+        yield reader.line_num, {key.strip(): value for key, value in record.items() if key}
+
+def _read_ndjson(f):
+    for number, line in enumerate(f, 1):
+        if line.strip():
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, RowError(f'Invalid JSON: {e}')
+
+def _read_json_array(f):
+    """Stream the objects of a top-level JSON array, one at a time"""
+    decoder = json.JSONDecoder()
+    buffer, position, number = '', 0, 0
+    started = False
+    while True:
+        chunk = f.read(READ_SIZE)
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position == len(buffer):
+                break
+            if not started:
+                if buffer[position] != '[':
+                    raise ImportFileError('A JSON import must be an array of objects')
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if not chunk:
+                    raise ImportFileError(f'Invalid JSON after record {number}')
+                break  # the record continues in the next chunk
+            number += 1
+            position = end
+            yield number, record
+        if not chunk:
+            raise ImportFileError('Unterminated JSON array')
+
+READERS = {'csv': _read_csv, 'ndjson': _read_ndjson, 'json': _read_json_array}
+EXTENSIONS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson', '.json': 'json'}
+
+def detect_format(path):
+    fmt = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ImportFileError(f'Cannot tell the format of {path}, pass --format')
+    return fmt
+
+
+# Field coercion: CSV gives strings, JSON may give numbers or lists
+
+def _text(value, field, limit=None):
+    value = str(value).strip()
+    if limit and len(value) > limit:
+        raise RowError(f'{field} is longer than {limit} characters')
+    return value
+
+def _price(value, field):
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        raise RowError(f'{field} must be a number')
+    if price < 0:
+        raise RowError(f'{field} must not be negative')
+    return price
+
+def _times(value, field):
+    """Schedule as stored in Doctor.available_times: a JSON list of "HH:MM" """
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith('['):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                raise RowError(f'{field} is not valid JSON')
+        else:
+            value = [t for t in value.replace(';', ',').split(',') if t.strip()]
+    if not isinstance(value, list):
+        raise RowError(f'{field} must be a list of HH:MM times')
+    try:
+        times = [datetime.strptime(str(t).strip(), '%H:%M').strftime('%H:%M') for t in value]
+    except ValueError:
+        raise RowError(f'{field} must be a list of HH:MM times')
+    return json.dumps(times)
+
+def _skip(counts, error):
+    counts['invalid'] += 1
+    if len(counts['errors']) < MAX_REPORTED_ERRORS:
+        counts['errors'].append(error)
+
+
+class Importer:
+    """Upsert rows of ``model`` matched on the natural key ``key``
+
+    ``fields`` maps each importable column to its coercion function. Rows
+    whose key is new must carry every field; rows for existing records may
+    omit fields to leave them as they are.
+    """
+
+    def __init__(self, model, key, fields):
+        self.model = model
+        self.key = key
+        self.fields = fields
+
+    def clean(self, record):
+        if isinstance(record, Exception):
+            raise record
+        if not isinstance(record, dict):
+            raise RowError('Each record must be an object')
+        row = {}
+        for field, coerce in self.fields.items():
+            value = record.get(field)
+            if value is None or (isinstance(value, str) and not value.strip()):
+                continue
+            row[field] = coerce(value, field)
+        if not row.get(self.key):
+            raise RowError(f'{self.key} is required')
+        return row
+
+    def upsert(self, rows, counts):
+        """Write one chunk of cleaned rows; returns the ids it touched"""
+        model, key = self.model, self.key
+        columns = [getattr(model, field) for field in self.fields]
+        existing = {
+            row[key]: row
+            for row in db.session.execute(
+                select(model.id, *columns).where(getattr(model, key).in_(list(rows)))
+            ).mappings()
+        }
+
+        inserts, updates = [], []
+        for natural_key, row in rows.items():
+            current = existing.get(natural_key)
+            if current is None:
+                missing = [field for field in self.fields if field not in row]
+                if missing:
+                    _skip(counts, f'{natural_key}: missing {", ".join(missing)}')
+                    continue
+                inserts.append(row)
+            else:
+                changed = {field: value for field, value in row.items() if current[field] != value}
+                if changed:
+                    updates.append(dict(changed, id=current['id']))
+                else:
+                    counts['unchanged'] += 1
+
+        ids = set()
+        if inserts:
+            ids.update(db.session.scalars(insert(model).returning(model.id), inserts))
+            counts['inserted'] += len(inserts)
+        if updates:
+            # Bulk UPDATE by primary key, one executemany per set of changed columns
+            db.session.execute(update(model), updates)
+            ids.update(row['id'] for row in updates)
+            counts['updated'] += len(updates)
+        return ids
+
+    def run(self, records, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+        """Import ``(position, record)`` pairs and return the counts
+
+        Each chunk is committed on its own so the write lock is never held
+        for the whole file; rows are upserts, so a failed import can simply
+        be run again. A chunk that wrote rows bumps the model's shared data
+        version in its transaction, which is how running servers learn to
+        refresh their catalog, cached responses and ETags.
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'invalid': 0, 'errors': []}
+        records = iter(records)
+        while True:
+            batch = list(islice(records, chunk_size))
+            if not batch:
+                break
+
+            rows = {}
+            for position, record in batch:
+                try:
+                    row = self.clean(record)
+                except RowError as e:
+                    _skip(counts, f'{position}: {e}')
+                    continue
+                # A key repeated within the chunk: the last row wins
+                natural_key = row[self.key]
+                rows[natural_key] = dict(rows.get(natural_key, {}), **row)
+
+            if rows:
+                ids = self.upsert(rows, counts)
+                if dry_run:
+                    db.session.rollback()
+                else:
+                    if ids:
+                        mark_changed(db.session, self.model.__name__, ids)
+                    db.session.commit()
+
+        return counts
+
+
+IMPORTERS = {
+    'products': Importer(Product, 'name', {
+        'name': lambda value, field: _text(value, field, 100),
+        'description': _text,
+        'price': _price,
+        'image_url': lambda value, field: _text(value, field, 255),
+        'category': lambda value, field: _text(value, field, 50),
+    }),
+    'doctors': Importer(Doctor, 'name', {
+        'name': lambda value, field: _text(value, field, 100),
+        'specialty': lambda value, field: _text(value, field, 100),
+        'available_times': _times,
+    }),
+}
+
+def import_file(kind, path, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """Upsert the products or doctors in a CSV, JSON or NDJSON file"""
+    importer = IMPORTERS[kind]
+    reader = READERS[fmt or detect_format(path)]
+    with io.open(path, encoding='utf-8-sig', newline='') as f:
+        return importer.run(reader(f), chunk_size=chunk_size, dry_run=dry_run)
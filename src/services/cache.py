@@ -0,0 +1,141 @@
+from collections import OrderedDict
+from functools import wraps
+import threading
+import time
+
+from flask import request, current_app
+
+from src.models.changes import on_commit
+from src.services.versions import data_version
+
+class TagCache:
+    """Bounded LRU cache with per-entry TTL and tag based invalidation
+
+    Tags name the rows an entry was built from: ``'Doctor:3'`` for a single
+    row or ``'Doctor:*'`` for anything depending on the whole table.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags = {}  # tag -> set of keys
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Bumped on every invalidation so in-flight fills can detect staleness
+        self.generation = 0
+
+    def get(self, key):
+        """Return the cached value or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, tags=(), ttl=None, generation=None):
+        """Store a value; skipped if an invalidation ran since ``generation``"""
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_tags(self, tags):
+        with self._lock:
+            self.generation += 1
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+response_cache = TagCache()
+# Serialized User.to_dict() by user id, for /api/auth/me. Only this process'
+# commits evict entries, so the TTL bounds how long another worker's profile
+# edit can go unseen.
+user_profiles = TagCache(maxsize=4096, ttl=60)
+
+@on_commit
+def _invalidate_changed_rows(changes):
+    tags = []
+    for model_name, ids in changes.items():
+        tags.append(f'{model_name}:*')
+        tags.extend(f'{model_name}:{pk}' for pk in ids)
+    for cache in (response_cache, user_profiles):
+        cache.invalidate_tags(tags)
+
+
+def cached_view(tags, ttl=None):
+    """Cache a view's successful JSON responses, keyed by its full URL
+
+    ``tags`` is called with the view arguments and returns the tags the
+    response depends on. The key also holds the shared data version of the
+    tagged models, so writes made by other processes, which never reach
+    this process' invalidation, still retire the entry.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            entry_tags = tags(**kwargs)
+            models = sorted({tag.split(':', 1)[0] for tag in entry_tags})
+            key = (request.full_path, data_version(*models))
+            entry = response_cache.get(key)
+            if entry is not None:
+                body, status = entry
+                response = current_app.response_class(body, status=status, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            generation = response_cache.generation
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and response.mimetype == 'application/json':
+                response_cache.set(key, (response.get_data(), response.status_code), entry_tags,
+                                   ttl=ttl, generation=generation)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,100 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from types import MappingProxyType
+import threading
+
+from src.models import Product
+from src.services.startup import phase
+from src.services.versions import data_version
+
+def _newest_first(p):
+    # Products without a creation date go last
+    created_at = p['created_at']
+    return (-datetime.fromisoformat(created_at).timestamp() if created_at else float('inf'), -p['id'])
+
+SORT_KEYS = {
+    'price_asc': lambda p: (p['price'], p['id']),
+    'price_desc': lambda p: (-p['price'], p['id']),
+    'name': lambda p: (p['name'].lower(), p['id']),
+    'newest': _newest_first,
+}
+
+class CatalogSnapshot:
+    """Immutable, pre-indexed view of the Product table"""
+
+    def __init__(self, version, products):
+        self.version = version
+        # Serialized once per snapshot, in table (id) order
+        self.products = tuple(products)
+        self.by_id = MappingProxyType({p['id']: p for p in self.products})
+
+        by_category = {}
+        for product in self.products:
+            by_category.setdefault(product['category'], []).append(product)
+        self.by_category = MappingProxyType({c: tuple(ps) for c, ps in by_category.items()})
+        self.categories = tuple(by_category)
+        self.category_counts = MappingProxyType({c: len(ps) for c, ps in by_category.items()})
+
+        self.by_price = tuple(sorted(self.products, key=SORT_KEYS['price_asc']))
+        self._prices = [p['price'] for p in self.by_price]
+
+    def _price_range(self, min_price, max_price):
+        """Slice of by_price between the given bounds (inclusive)"""
+        lo = bisect_left(self._prices, min_price) if min_price is not None else 0
+        hi = bisect_right(self._prices, max_price) if max_price is not None else len(self._prices)
+        return self.by_price[lo:hi]
+
+    def query(self, category=None, min_price=None, max_price=None, sort=None):
+        """Filter and sort products, returning (products, category facet counts)"""
+        if min_price is None and max_price is None:
+            facets = dict(self.category_counts)
+            candidates = self.by_category.get(category, ()) if category else self.products
+        else:
+            candidates = self._price_range(min_price, max_price)
+            if sort is None:
+                candidates = sorted(candidates, key=lambda p: p['id'])
+            # Facets count every category matching the other filters
+            facets = {}
+            for product in candidates:
+                facets[product['category']] = facets.get(product['category'], 0) + 1
+            if category:
+                candidates = [p for p in candidates if p['category'] == category]
+
+        if sort is not None:
+            candidates = sorted(candidates, key=SORT_KEYS[sort])
+
+        return list(candidates), facets
+
+
+class Catalog:
+    """Holds the current snapshot and rebuilds it when the Product table changes
+
+    A snapshot is tagged with the shared Product data version it was built
+    at, so writes from any process (other workers, import-data) are picked
+    up on the next request. The check reuses the version lookup of the
+    request's ETag.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """Current snapshot, rebuilt from the database if stale (needs app context)"""
+        (version,) = data_version('Product')
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != version:
+                with phase('catalog_snapshot'):
+                    products = [p.to_dict() for p in Product.query.order_by(Product.id).all()]
+                    self._snapshot = CatalogSnapshot(version, products)
+            return self._snapshot
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+
+
+catalog = Catalog()
@@ -0,0 +1,46 @@
+import gzip
+
+from flask import request
+
+from src.services.cache import TagCache
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript'}
+DEFAULT_MIN_SIZE = 500
+DEFAULT_LEVEL = 6
+# Appended to a response's ETag when its gzip variant is sent
+GZIP_ETAG_SUFFIX = '-gz'
+
+# Compressed bodies of responses that carry a stable ETag, keyed by ETag
+compressed_cache = TagCache(maxsize=256, ttl=3600)
+
+def init_compression(app):
+    """Gzip responses above COMPRESS_MIN_SIZE for clients that accept it"""
+    min_size = app.config.get('COMPRESS_MIN_SIZE', DEFAULT_MIN_SIZE)
+    level = app.config.get('COMPRESS_LEVEL', DEFAULT_LEVEL)
+
+    @app.after_request
+    def compress_response(response):
+        if (response.mimetype not in COMPRESSIBLE_MIMETYPES
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        if (response.status_code != 200
+                or 'gzip' not in request.accept_encodings
+                or response.content_length is None
+                or response.content_length < min_size):
+            return response
+
+        etag, weak = response.get_etag()
+        body = compressed_cache.get(etag) if etag else None
+        if body is None:
+            body = gzip.compress(response.get_data(), compresslevel=level, mtime=0)
+            if etag:
+                compressed_cache.set(etag, body)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = 'gzip'
+        if etag:
+            response.set_etag(etag + GZIP_ETAG_SUFFIX, weak=weak)
+        return response
@@ -0,0 +1,183 @@
+from collections import OrderedDict
+import hashlib
+import re
+import threading
+
+from markupsafe import escape
+
+# Renders the Markdown subset our articles use: ATX headings, nested
+# ordered/unordered lists, paragraphs, horizontal rules, **bold**, *italic*,
+# `code` and [links](https://...). All source text is HTML-escaped first
+# and only the tags below are ever emitted, so the output is safe to embed.
+
+HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+LIST_ITEM = re.compile(r'^(\s*)([-*+]|\d+[.)])\s+(.*)$')
+RULE = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+
+INLINE_CODE = re.compile(r'`([^`]+)`')
+BOLD = re.compile(r'\*\*(.+?)\*\*|__(.+?)__')
+ITALIC = re.compile(r'(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])')
+LINK = re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)')
+SAFE_URL = re.compile(r'^(https?://|mailto:|/|#)', re.IGNORECASE)
+
+TOC_LEVELS = (2, 3)
+CACHE_SIZE = 256
+
+def _inline(text):
+    """Escape a run of text and apply inline formatting"""
+    html = str(escape(text))
+    # Finished tags are swapped for placeholders so later passes can't reach
+    # into them: code spans keep their text, links their href
+    stash = []
+    sources = []  # the escaped source text behind each placeholder
+
+    def stashed(fragment, source=''):
+        stash.append(fragment)
+        sources.append(source)
+        return f'\x00{len(stash) - 1}\x00'
+
+    def emphasis(fragment):
+        fragment = BOLD.sub(lambda m: f'<strong>{m.group(1) or m.group(2)}</strong>', fragment)
+        return ITALIC.sub(lambda m: f'<em>{m.group(1)}</em>', fragment)
+
+    def link(match):
+        # Backticks in a URL are part of the address, not a code span
+        label = emphasis(match.group(1))
+        url = re.sub('\x00(\\d+)\x00', lambda m: sources[int(m.group(1))], match.group(2))
+        if not SAFE_URL.match(url):
+            return label
+        return stashed(f'<a href="{url}" rel="noopener nofollow">{label}</a>')
+
+    def restore(fragment):
+        return re.sub('\x00(\\d+)\x00', lambda m: restore(stash[int(m.group(1))]), fragment)
+
+    html = INLINE_CODE.sub(lambda m: stashed(f'<code>{m.group(1)}</code>', m.group()), html)
+    html = LINK.sub(link, html)
+    return restore(emphasis(html))
+
+def _slug(text, used):
+    slug = re.sub(r'[^\w\s-]', '', text).strip().lower()
+    slug = re.sub(r'[\s_]+', '-', slug) or 'section'
+    candidate, n = slug, 2
+    while candidate in used:
+        candidate, n = f'{slug}-{n}', n + 1
+    used.add(candidate)
+    return candidate
+
+def _plain(text):
+    """Heading text without inline markup, for the table of contents"""
+    return re.sub(r'[*_`]', '', LINK.sub(r'\1', text)).strip()
+
+def plain_text(text):
+    """The article's text without Markdown syntax, one line per source line
+
+    Heading marks, list markers, rules and inline markup are dropped and
+    links keep their label, so excerpts read like the rendered article.
+    """
+    lines = []
+    for line in text.splitlines():
+        if RULE.match(line):
+            lines.append('')
+            continue
+        heading = HEADING.match(line)
+        item = LIST_ITEM.match(line) if heading is None else None
+        if heading:
+            line = heading.group(2)
+        elif item:
+            line = item.group(3)
+        lines.append(_plain(line))
+    return '\n'.join(lines)
+
+
+def render(text):
+    """Render Markdown to ``(html, toc)``
+
+    ``toc`` lists ``{'level', 'text', 'id'}`` for level 2-3 headings; every
+    heading gets an ``id`` so the entries can be linked.
+    """
+    out = []
+    toc = []
+    used_ids = set()
+    paragraph = []
+    lists = []  # stack of (indent, tag)
+    blank = False
+
+    def close_paragraph():
+        if paragraph:
+            out.append(f"<p>{_inline(' '.join(paragraph))}</p>")
+            paragraph.clear()
+
+    def close_lists(indent=-1):
+        while lists and lists[-1][0] > indent:
+            out.append(f'</li></{lists.pop()[1]}>')
+
+    for line in text.splitlines():
+        if not line.strip():
+            close_paragraph()
+            blank = True
+            continue
+        after_blank, blank = blank, False
+
+        heading = HEADING.match(line)
+        if heading:
+            close_paragraph()
+            close_lists()
+            level = len(heading.group(1))
+            title = heading.group(2)
+            anchor = _slug(_plain(title), used_ids)
+            out.append(f'<h{level} id="{anchor}">{_inline(title)}</h{level}>')
+            if level in TOC_LEVELS:
+                toc.append({'level': level, 'text': _plain(title), 'id': anchor})
+            continue
+
+        if RULE.match(line):
+            close_paragraph()
+            close_lists()
+            out.append('<hr>')
+            continue
+
+        item = LIST_ITEM.match(line)
+        if item:
+            close_paragraph()
+            indent = len(item.group(1).expandtabs(4))
+            tag = 'ul' if item.group(2) in '-*+' else 'ol'
+            close_lists(indent)
+            if lists and lists[-1][0] == indent and lists[-1][1] == tag:
+                out.append('</li>')
+            else:
+                if lists and lists[-1][0] == indent:
+                    out.append(f'</li></{lists.pop()[1]}>')
+                out.append(f'<{tag}>')
+                lists.append((indent, tag))
+            out.append(f'<li>{_inline(item.group(3))}')
+            continue
+
+        if lists and not after_blank and not paragraph:
+            # Lazy continuation of the current list item
+            out.append(' ' + _inline(line.strip()))
+            continue
+        close_lists()
+
+        paragraph.append(line.strip())
+
+    close_paragraph()
+    close_lists()
+    return '\n'.join(out), toc
+
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+def render_cached(text):
+    """render() memoized by content hash, so unchanged bodies render once"""
+    key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    result = render(text)
+    with _lock:
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
@@ -0,0 +1,205 @@
+from bisect import bisect_left
+import hmac
+import threading
+import time
+
+from flask import g, has_request_context, request, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.services.availability import parse_schedule
+from src.services.cache import response_cache, user_profiles
+from src.services.compression import compressed_cache
+from src.services.passwords import password_hasher
+from src.services.query_budget import query_count
+from src.services.startup import timings
+from src.services.write_queue import group_commit
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Label for SQL run outside of a request (CLI, group-commit writer)
+NO_ENDPOINT = '(none)'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values=(), amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} counter'
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            yield f'{self.name}{_labels(self.labels, label_values)} {value}'
+
+
+class Histogram:
+    """Per-label bucket counts; observing is one bisect and one locked update"""
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, label_values=()):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} histogram'
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        names = self.labels + ('le',)
+        for label_values, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                cumulative += count
+                yield f'{self.name}_bucket{_labels(names, label_values + (bound,))} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labels, label_values)} {values[-1]}'
+            yield f'{self.name}_count{_labels(self.labels, label_values)} {cumulative}'
+
+
+def _samples(name, help, samples, labels=(), kind='gauge'):
+    """Render ``samples`` (label values -> value) read at scrape time"""
+    yield f'# HELP {name} {help}'
+    yield f'# TYPE {name} {kind}'
+    for label_values, value in samples:
+        yield f'{name}{_labels(labels, label_values)} {value}'
+
+
+request_duration = Histogram('queencare_http_request_duration_seconds',
+                             'Time spent handling requests', ('endpoint', 'method', 'status'))
+db_statements = Counter('queencare_db_statements_total', 'SQL statements executed', ('endpoint',))
+db_seconds = Counter('queencare_db_statement_seconds_total', 'Time spent executing SQL statements', ('endpoint',))
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('statement_started', []).append(time.perf_counter())
+
+def _record_statement(conn):
+    started = conn.info.get('statement_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    if has_request_context():
+        g.query_seconds = g.get('query_seconds', 0.0) + elapsed
+    else:
+        db_statements.inc((NO_ENDPOINT,))
+        db_seconds.inc((NO_ENDPOINT,), elapsed)
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _end_statement(conn, cursor, statement, parameters, context, executemany):
+    _record_statement(conn)
+
+@event.listens_for(Engine, 'handle_error')
+def _failed_statement(context):
+    # A raising statement never reaches after_cursor_execute; without this its
+    # start time would stay on the pooled connection and skew later timings
+    if context.connection is not None:
+        _record_statement(context.connection)
+
+def _cache_samples():
+    caches = {
+        'response': response_cache.stats(),
+        'user_profiles': user_profiles.stats(),
+        'compressed': compressed_cache.stats(),
+    }
+    info = parse_schedule.cache_info()
+    caches['doctor_schedules'] = {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
+    return caches
+
+def render_metrics():
+    """All metrics of this process in the Prometheus text format"""
+    lines = []
+    lines.extend(request_duration.render())
+    lines.extend(db_statements.render())
+    lines.extend(db_seconds.render())
+
+    caches = _cache_samples()
+    lines.extend(_samples('queencare_cache_hits_total', 'Cache lookups answered from the cache',
+                          [((name,), stats['hits']) for name, stats in caches.items()], ('cache',), 'counter'))
+    lines.extend(_samples('queencare_cache_misses_total', 'Cache lookups that missed',
+                          [((name,), stats['misses']) for name, stats in caches.items()], ('cache',), 'counter'))
+    lines.extend(_samples('queencare_cache_hit_ratio', 'Hits over lookups since the process started',
+                          [((name,), round(stats['hits'] / ((stats['hits'] + stats['misses']) or 1), 4))
+                           for name, stats in caches.items()], ('cache',)))
+    lines.extend(_samples('queencare_cache_entries', 'Entries currently cached',
+                          [((name,), stats['size']) for name, stats in caches.items()], ('cache',)))
+
+    hashing = password_hasher.stats()
+    lines.extend(_samples('queencare_password_hashes_total', 'Password hashes computed',
+                          [((), hashing['completed'])], kind='counter'))
+    lines.extend(_samples('queencare_password_hash_rejected_total', 'Password hashes refused as busy',
+                          [((), hashing['rejected'])], kind='counter'))
+    lines.extend(_samples('queencare_password_hash_queued', 'Password hashes waiting for a worker',
+                          [((), hashing['queued'])]))
+
+    writes = group_commit.stats()
+    lines.extend(_samples('queencare_group_commit_batches_total', 'Transactions committed by the group-commit writer',
+                          [((), writes['batches'])], kind='counter'))
+    lines.extend(_samples('queencare_group_commit_jobs_total', 'Inserts handled by the group-commit writer',
+                          [((), writes['jobs'])], kind='counter'))
+    lines.extend(_samples('queencare_group_commit_queued', 'Inserts waiting for the group-commit writer',
+                          [((), writes['queued'])]))
+
+    lines.extend(_samples('queencare_startup_phase_seconds', 'Duration of startup phases and first-use builds',
+                          sorted(((phase,), round(seconds, 6)) for phase, seconds in timings.items()), ('phase',)))
+    return '\n'.join(lines) + '\n'
+
+def init_metrics(app):
+    """Time every request and serve the metrics at /metrics
+
+    Metrics are kept per process. If METRICS_TOKEN is set, /metrics
+    requires it as a bearer token.
+    """
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+        g.request_queries = query_count()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('request_started', None)
+        if started is None:
+            return response
+        endpoint = request.endpoint or 'unmatched'
+        request_duration.observe(time.perf_counter() - started,
+                                 (endpoint, request.method, str(response.status_code)))
+        statements = query_count() - g.pop('request_queries', 0)
+        if statements:
+            db_statements.inc((endpoint,), statements)
+            db_seconds.inc((endpoint,), g.pop('query_seconds', 0.0))
+        return response
+
+    def metrics():
+        token = current_app.config.get('METRICS_TOKEN')
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return 'Unauthorized', 401
+        return current_app.response_class(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/metrics', 'metrics', metrics)
@@ -0,0 +1,66 @@
+from datetime import datetime
+import base64
+import json
+
+from flask import request, current_app
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(sort_value, row_id):
+    """Opaque token for the position just after (sort_value, row_id)"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        sort_value, row_id = json.loads(raw)
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+
+def page_size_arg():
+    """Page size from ``?limit=``, bounded by the PAGE_SIZE/MAX_PAGE_SIZE config"""
+    default = current_app.config.get('PAGE_SIZE', DEFAULT_PAGE_SIZE)
+    maximum = current_app.config.get('MAX_PAGE_SIZE', MAX_PAGE_SIZE)
+    limit = request.args.get('limit', default, type=int)
+    return max(1, min(limit, maximum))
+
+def keyset_page(query, sort_column, id_column, descending=True):
+    """Fetch one page of ``query`` ordered by (sort_column, id_column)
+
+    Reads ``?cursor=`` and ``?limit=`` from the request and returns
+    ``(rows, next_cursor)``. The seek predicate lets the database start at
+    the cursor through the (sort_column, id) index instead of skipping
+    rows, so every page costs the same.
+    """
+    limit = page_size_arg()
+    token = request.args.get('cursor')
+
+    if token:
+        sort_value, row_id = decode_cursor(token)
+        key = tuple_(sort_column, id_column)
+        if descending:
+            query = query.filter(key < tuple_(sort_value, row_id))
+        else:
+            query = query.filter(key > tuple_(sort_value, row_id))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
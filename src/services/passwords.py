@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from flask import current_app, has_app_context
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+
+# werkzeug's default; stored hashes with other parameters get upgraded on login
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_QUEUE = 32
+
+class HasherBusy(RuntimeError):
+    """Too many hashes queued; the caller should retry later"""
+
+
+def normalize_method(method):
+    """Spell out the parameters werkzeug fills in for a short method name
+
+    ``'pbkdf2'`` and ``'pbkdf2:sha256'`` become ``'pbkdf2:sha256:<iterations>'``
+    and ``'scrypt'`` becomes ``'scrypt:32768:8:1'``, the form stored in hashes.
+    """
+    name, *args = method.split(':')
+    try:
+        if name == 'scrypt':
+            n, r, p = map(int, args) if args else (2 ** 15, 8, 1)
+            return f'scrypt:{n}:{r}:{p}'
+        if name == 'pbkdf2':
+            hash_name = args[0] if args else 'sha256'
+            iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+            return f'pbkdf2:{hash_name}:{iterations}'
+    except ValueError:
+        pass
+    return method
+
+
+class PasswordHasher:
+    """Runs the password KDF on a small dedicated thread pool
+
+    The KDFs release the GIL, so request threads just wait on the result
+    while at most PASSWORD_HASH_WORKERS hashes run at once and at most
+    PASSWORD_HASH_MAX_QUEUE wait; beyond that HasherBusy is raised instead
+    of tying up more request workers.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+        self.max_queue = DEFAULT_MAX_QUEUE
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def _config(self, key, default):
+        return current_app.config.get(key, default) if has_app_context() else default
+
+    @property
+    def method(self):
+        return self._config('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._executor is None:
+                workers = self._config('PASSWORD_HASH_WORKERS', DEFAULT_WORKERS)
+                self.max_queue = self._config('PASSWORD_HASH_MAX_QUEUE', DEFAULT_MAX_QUEUE)
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+            if self.pending >= self.max_queue:
+                self.rejected += 1
+                raise HasherBusy('Too many authentication requests, please retry shortly')
+            self.pending += 1
+        return self._executor.submit(self._timed, fn, *args).result()
+
+    def _timed(self, fn, *args):
+        with self._lock:
+            self.pending -= 1
+            self.running += 1
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.total_seconds += elapsed
+                self.max_seconds = max(self.max_seconds, elapsed)
+
+    def hash(self, password):
+        return self._submit(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._submit(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with other parameters than configured"""
+        return normalize_method(password_hash.split('$', 1)[0]) != normalize_method(self.method)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self.pending,
+                'running': self.running,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'avg_seconds': self.total_seconds / self.completed if self.completed else 0.0,
+                'max_seconds': self.max_seconds,
+            }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,39 @@
+from src.models import Product, OrderItem
+
+class PricingError(ValueError):
+    pass
+
+def price_items(lines):
+    """Build priced OrderItems for cart ``lines`` with a single product lookup
+
+    Each line needs a product ``id`` and an optional ``quantity``; any price
+    sent by the client is ignored. Returns ``(items, total_price)``.
+    """
+    if not isinstance(lines, list):
+        raise PricingError('Products must be a list')
+
+    quantities = {}
+    for line in lines:
+        if not isinstance(line, dict):
+            raise PricingError('Each product must be an object')
+        try:
+            product_id = int(line.get('id'))
+            quantity = int(line.get('quantity', 1))
+        except (TypeError, ValueError):
+            raise PricingError('Invalid product id or quantity')
+        if quantity < 1:
+            raise PricingError('Quantity must be at least 1')
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+
+    products = {p.id: p for p in Product.query.filter(Product.id.in_(quantities)).all()}
+    missing = [str(product_id) for product_id in quantities if product_id not in products]
+    if missing:
+        raise PricingError(f"Unknown product id(s): {', '.join(missing)}")
+
+    items = [
+        OrderItem(product_id=product_id, name=products[product_id].name,
+                  unit_price=products[product_id].price, quantity=quantity)
+        for product_id, quantity in quantities.items()
+    ]
+    total_price = sum(item.unit_price * item.quantity for item in items)
+    return items, total_price
@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from functools import wraps
+import logging
+
+from flask import g, has_app_context, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+def query_count():
+    """SQL statements executed so far in the current app context"""
+    return g.get('query_count', 0)
+
+@contextmanager
+def count_queries():
+    """Count statements issued inside the block: ``with count_queries() as n: ...; n()``"""
+    start = query_count()
+    yield lambda: query_count() - start
+
+def query_budget(max_queries):
+    """Flag a view that issues more than ``max_queries`` SQL statements
+
+    Over-budget requests are logged as warnings, or raise
+    QueryBudgetExceeded when ``QUERY_BUDGET_RAISE`` is set (e.g. in tests).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with count_queries() as used:
+                response = view(*args, **kwargs)
+            if used() > max_queries:
+                message = f'{view.__name__} issued {used()} SQL statements, budget is {max_queries}'
+                if current_app.config.get('QUERY_BUDGET_RAISE'):
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return response
+        return wrapper
+    return decorator
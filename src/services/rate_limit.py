@@ -0,0 +1,98 @@
+from collections import OrderedDict
+from functools import wraps
+import math
+import threading
+import time
+
+from flask import request, session, jsonify, current_app
+
+class Policy:
+    """Token bucket: ``capacity`` burst, refilled at ``per_minute`` tokens a minute"""
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+
+
+class MemoryBackend:
+    """Per-process bucket store
+
+    Each call touches one bucket, O(1). Buckets idle long enough to have
+    refilled completely are indistinguishable from new ones, so they are
+    dropped from the least recently used end as requests come in.
+    Another backend (e.g. Redis) only needs to provide ``take()``.
+    """
+
+    def __init__(self, max_buckets=100000, idle_seconds=600):
+        self.max_buckets = max_buckets
+        self.idle_seconds = idle_seconds
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key, policy, now=None):
+        """Consume a token; returns seconds to wait, 0 when allowed"""
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (policy.capacity, now))
+            tokens = min(policy.capacity, tokens + (now - updated_at) * policy.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / policy.rate
+            self._buckets[key] = (tokens, now)
+            self._evict(now)
+        return wait
+
+    def _evict(self, now):
+        while self._buckets:
+            key, (_, updated_at) = next(iter(self._buckets.items()))
+            if len(self._buckets) <= self.max_buckets and now - updated_at < self.idle_seconds:
+                break
+            del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+backend = MemoryBackend()
+
+def session_account():
+    return session.get('user_id')
+
+def email_account():
+    data = request.get_json(silent=True) or {}
+    email = data.get('email')
+    return email.strip().lower() if isinstance(email, str) else None
+
+def rate_limit(per_ip=None, per_account=None, account=session_account):
+    """Answer 429 with Retry-After once the IP's or account's bucket is empty
+
+    ``account`` returns the account key for the request (the session user
+    by default); requests without one are only limited per IP. Behind a
+    reverse proxy, set TRUSTED_PROXIES so the IP is the client's, not the
+    proxy's.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('RATE_LIMIT_ENABLED', True):
+                return view(*args, **kwargs)
+
+            checks = []
+            if per_ip is not None:
+                checks.append((f'{request.endpoint}:ip:{request.remote_addr}', per_ip))
+            if per_account is not None:
+                account_key = account()
+                if account_key is not None:
+                    checks.append((f'{request.endpoint}:account:{account_key}', per_account))
+
+            wait = max((backend.take(key, policy) for key, policy in checks), default=0)
+            if wait:
+                response = jsonify({'error': 'Too many requests, please try again later'})
+                response.status_code = 429
+                response.headers['Retry-After'] = str(math.ceil(wait))
+                return response
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
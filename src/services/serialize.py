@@ -0,0 +1,100 @@
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional, the standard library encoder is used instead
+    orjson = None
+
+def _default(o):
+    # ISO 8601 like the models' to_dict(), not Flask's HTTP dates
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes with orjson when it is installed
+
+    Datetimes are written in ISO 8601 by the encoder itself, so projected
+    rows can carry them unconverted. Without orjson this is Flask's
+    provider with the same datetime format.
+    """
+
+    default = staticmethod(_default)
+
+    def _orjson_options(self, indent=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or set(kwargs) - {'separators'}:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._orjson_options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=_default, option=self._orjson_options(indent))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+class Projection:
+    """Named columns fetched as plain tuples instead of ORM objects
+
+    ``Projection(id=User.id, name=User.name)`` selects just those columns
+    with ``apply(query)`` and turns the result rows into dicts with
+    ``dicts(rows)``. A nested Projection becomes a nested dict, or None when
+    all of its columns are NULL (an outer join without a match); its columns
+    are labelled ``<name>__<field>`` so they don't shadow the outer ones.
+    """
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self.columns = []
+        for name, value in fields.items():
+            if isinstance(value, Projection):
+                self.columns.extend(column.label(f'{name}__{field}') for field, column in value._flat())
+            else:
+                self.columns.append(value)
+
+    def _flat(self):
+        for name, value in self.fields.items():
+            if isinstance(value, Projection):
+                for field, column in value._flat():
+                    yield f'{name}__{field}', column
+            else:
+                yield name, value
+
+    def apply(self, query):
+        return query.with_entities(*self.columns)
+
+    def _build(self, row, start):
+        result = {}
+        position = start
+        for name, value in self.fields.items():
+            if isinstance(value, Projection):
+                nested, position = value._build(row, position)
+                result[name] = nested if any(v is not None for v in nested.values()) else None
+            else:
+                result[name] = row[position]
+                position += 1
+        return result, position
+
+    def dicts(self, rows):
+        if not any(isinstance(value, Projection) for value in self.fields.values()):
+            names = tuple(self.fields)
+            return [dict(zip(names, row)) for row in rows]
+        return [self._build(row, 0)[0] for row in rows]
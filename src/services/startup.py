@@ -0,0 +1,37 @@
+from contextlib import contextmanager
+import logging
+import time
+
+logger = logging.getLogger('queencare.startup')
+
+# Duration in seconds of each startup phase and lazy first-use build
+timings = {}
+
+@contextmanager
+def phase(name):
+    """Time a startup phase and log it on the ``queencare.startup`` logger"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings[name] = elapsed
+        logger.info('%s took %.1f ms', name, elapsed * 1000)
+
+
+class PhaseTimer:
+    """Record consecutive phases: each ``mark(name)`` times the span since the last one"""
+
+    def __init__(self):
+        self.started = self.last = time.perf_counter()
+
+    def mark(self, name):
+        now = time.perf_counter()
+        timings[name] = now - self.last
+        logger.info('%s took %.1f ms', name, (now - self.last) * 1000)
+        self.last = now
+
+    def finish(self, name):
+        """Record the total since the timer was created"""
+        self.last = self.started
+        self.mark(name)
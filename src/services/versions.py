@@ -0,0 +1,26 @@
+from flask import g, has_request_context
+
+from src.models import db, DataVersion
+from src.models.changes import on_commit
+
+def data_version(*model_names):
+    """Current shared change counters for the given models (needs app context)
+
+    Read from the data_version table, which every process bumps in the
+    transaction that writes the rows, and remembered for the rest of the
+    request so the ETag, cache and catalog checks of one request share a
+    single SELECT.
+    """
+    known = g.setdefault('data_versions', {}) if has_request_context() else {}
+    missing = [name for name in model_names if name not in known]
+    if missing:
+        rows = db.session.execute(db.select(DataVersion.name, DataVersion.version)
+                                  .where(DataVersion.name.in_(missing)))
+        known.update(dict.fromkeys(missing, 0))
+        known.update(rows.tuples().all())
+    return tuple(known[name] for name in model_names)
+
+@on_commit
+def _forget_versions(changes):
+    if has_request_context():
+        g.pop('data_versions', None)
@@ -0,0 +1,163 @@
+from concurrent.futures import Future
+import os
+import queue
+import threading
+import time
+
+from flask import current_app
+
+from src.models import db
+
+DEFAULT_WINDOW_MS = 5
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_QUEUE = 1024
+DEFAULT_TIMEOUT = 30
+
+class WriteQueueFull(RuntimeError):
+    """Too many writes waiting; the caller should retry later"""
+
+
+class _Job:
+    __slots__ = ('build', 'render', 'future')
+
+    def __init__(self, build, render):
+        self.build = build
+        self.render = render
+        self.future = Future()
+
+
+class GroupCommitWriter:
+    """Single writer thread that commits queued inserts in groups
+
+    Each job is ``build(session)``, which adds rows and returns the object
+    to report, and ``render(obj)``, which turns it into the caller's result
+    once it has been flushed (so generated ids are known). Whatever arrives
+    within WRITE_QUEUE_WINDOW_MS of the first waiting job, up to
+    WRITE_QUEUE_MAX_BATCH jobs, shares one transaction and one commit.
+
+    A job whose flush fails (e.g. a slot already booked) gets the exception;
+    the transaction is rolled back and the rest of the group is replayed
+    without it, so ``build`` must be safe to call again: it has to create
+    new objects on every call rather than add ones made beforehand.
+    """
+
+    def __init__(self):
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.jobs = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_batch_seen = 0
+
+    def _start(self, app):
+        with self._lock:
+            # A forked worker inherits the queue but not the thread
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(app.config.get('WRITE_QUEUE_MAX_QUEUE', DEFAULT_MAX_QUEUE))
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, args=(app, self._queue),
+                                            name='group-commit', daemon=True)
+            self._thread.start()
+
+    def submit(self, build, render, timeout=None):
+        """Queue a write and wait for its committed result"""
+        app = current_app._get_current_object()
+        if self._thread is None or self._pid != os.getpid():
+            self._start(app)
+        job = _Job(build, render)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise WriteQueueFull('Too many pending writes, please retry shortly')
+        return job.future.result(timeout or app.config.get('WRITE_QUEUE_TIMEOUT', DEFAULT_TIMEOUT))
+
+    def _run(self, app, jobs):
+        while True:
+            batch = [jobs.get()]
+            # Read per group so a changed setting applies to the running writer
+            window = app.config.get('WRITE_QUEUE_WINDOW_MS', DEFAULT_WINDOW_MS) / 1000
+            max_batch = app.config.get('WRITE_QUEUE_MAX_BATCH', DEFAULT_MAX_BATCH)
+            deadline = time.monotonic() + window
+            while len(batch) < max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(jobs.get(timeout=remaining) if remaining > 0 else jobs.get_nowait())
+                except queue.Empty:
+                    break
+            with app.app_context():
+                self._commit(batch)
+
+    def _commit(self, batch):
+        pending = list(batch)
+        while pending:
+            results = []
+            try:
+                for job in pending:
+                    obj = job.build(db.session)
+                    try:
+                        db.session.flush()
+                    except Exception as e:
+                        db.session.rollback()
+                        # Objects of the rolled-back attempt must not leak into the replay
+                        db.session.expunge_all()
+                        job.future.set_exception(e)
+                        pending.remove(job)
+                        self.failed += 1
+                        break
+                    results.append((job, job.render(obj)))
+                else:
+                    db.session.commit()
+                    for job, result in results:
+                        job.future.set_result(result)
+                    pending = []
+            except Exception as e:
+                # Commit or build failure: nothing of the group was written
+                db.session.rollback()
+                db.session.expunge_all()
+                for job in pending:
+                    job.future.set_exception(e)
+                self.failed += len(pending)
+                pending = []
+        with self._lock:
+            self.batches += 1
+            self.jobs += len(batch)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self._queue.qsize() if self._queue is not None else 0,
+                'batches': self.batches,
+                'jobs': self.jobs,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'avg_batch': self.jobs / self.batches if self.batches else 0.0,
+                'max_batch': self.max_batch_seen,
+            }
+
+
+group_commit = GroupCommitWriter()
+
+def insert(build, render):
+    """Add the rows of ``build(session)`` and return ``render(obj)`` once committed
+
+    Goes through the group-commit writer when WRITE_QUEUE_ENABLED is set,
+    otherwise commits on the request's own session.
+    """
+    if current_app.config.get('WRITE_QUEUE_ENABLED'):
+        return group_commit.submit(build, render)
+    obj = build(db.session)
+    try:
+        db.session.flush()
+        result = render(obj)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return result
@@ -13,13 +13,50 @@ document.addEventListener('DOMContentLoaded', function() {
 
 // Initialize the application
 async function initializeApp() {
-    await checkAuthStatus();
-    await loadProducts();
-    await loadDoctors();
+    await loadInitialData();
     updateCartDisplay();
     setupEventListeners();
 }
 
+// Fetch the user, products and doctors in a single round trip
+async function loadInitialData() {
+    try {
+        const response = await fetch('/api/batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                requests: [
+                    { id: 'me', path: '/api/auth/me' },
+                    { id: 'products', path: '/api/products' },
+                    { id: 'doctors', path: '/api/doctors' }
+                ]
+            })
+        });
+        if (!response.ok) {
+            throw new Error(`Batch request failed: ${response.status}`);
+        }
+        const data = await response.json();
+        const results = {};
+        data.responses.forEach(item => { results[item.id] = item; });
+        
+        const me = results.me;
+        currentUser = me && me.status === 200 && me.body.user ? me.body.user : null;
+        updateAuthUI(Boolean(currentUser));
+        
+        products = (results.products.body && results.products.body.products) || [];
+        displayProducts(products);
+        
+        doctors = (results.doctors.body && results.doctors.body.doctors) || [];
+        populateDoctorSelect();
+    } catch (error) {
+        // Fall back to one request per resource
+        console.error('Error loading batched data:', error);
+        await checkAuthStatus();
+        await loadProducts();
+        await loadDoctors();
+    }
+}
+
 // Check authentication status
 async function checkAuthStatus() {
     try {